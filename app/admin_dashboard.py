@@ -1,7 +1,59 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+from config import ADMIN_PAGE_SIZE
 from models import Booking, Customer, get_session
-from sqlalchemy import or_
+from sqlalchemy import case, func, or_
+from utils import tracing
+from utils.analytics import booking_analytics
+from utils.search import search_bookings
+from utils.service_catalog import service_catalog
+
+COLUMNS = [
+    'Booking ID', 'Customer Name', 'Email', 'Phone',
+    'Service Type', 'Date', 'Time', 'Status', 'Created At'
+]
+LISTING = (
+    Booking.id, Customer.name, Customer.email, Customer.phone, Booking.booking_type,
+    Booking.date, Booking.time, Booking.status, Booking.created_at
+)
+
+def booking_summary(session):
+    """Header metrics and per-service counts, aggregated in the database"""
+    today = pd.Timestamp.now().strftime('%Y-%m-%d')
+    total, confirmed, customers, today_count = session.query(
+        func.count(Booking.id),
+        func.coalesce(func.sum(case((Booking.status == 'confirmed', 1), else_=0)), 0),
+        func.count(func.distinct(Booking.customer_id)),
+        func.coalesce(func.sum(case((Booking.date == today, 1), else_=0)), 0),
+    ).one()
+    service_counts = pd.Series(dict(
+        session.query(Booking.booking_type, func.count(Booking.id)).group_by(Booking.booking_type).all()
+    ), dtype='int64').sort_values(ascending=False)
+    return {
+        'total': total, 'confirmed': confirmed, 'customers': customers, 'today': today_count,
+        'services': service_counts,
+    }
+
+def filter_bookings(query, search_date: str, search_service: str):
+    if search_date:
+        query = query.filter(Booking.date.contains(search_date, autoescape=True))
+    if search_service != "All services":
+        query = query.filter(Booking.booking_type == search_service)
+    return query
+
+def count_bookings(session, search_date: str, search_service: str) -> int:
+    return filter_bookings(session.query(func.count(Booking.id)), search_date, search_service).scalar()
+
+def booking_page(session, search_date: str, search_service: str, page: int, page_size: int) -> pd.DataFrame:
+    """One page of matching bookings, newest first"""
+    rows = (
+        filter_bookings(session.query(*LISTING).join(Customer), search_date, search_service)
+        .order_by(Booking.created_at.desc())
+        .limit(page_size).offset((page - 1) * page_size)
+        .all()
+    )
+    return pd.DataFrame(rows, columns=COLUMNS)
 
 def show_admin_dashboard():
     """Display admin dashboard for viewing bookings"""
@@ -13,82 +65,74 @@ def show_admin_dashboard():
     session = get_session()
     
     try:
-        # Fetch all bookings with customer info
-        bookings = session.query(
-            Booking.id,
-            Customer.name,
-            Customer.email,
-            Customer.phone,
-            Booking.booking_type,
-            Booking.date,
-            Booking.time,
-            Booking.status,
-            Booking.created_at
-        ).join(Customer).order_by(Booking.created_at.desc()).all()
-        
-        if not bookings:
+        # Aggregates only: the bookings themselves are fetched one page at a time
+        summary = booking_summary(session)
+        
+        if not summary['total']:
             st.info("📭 No bookings found in the system yet.")
             return
         
-        # Convert to DataFrame
-        df = pd.DataFrame(bookings, columns=[
-            'Booking ID', 'Customer Name', 'Email', 'Phone',
-            'Service Type', 'Date', 'Time', 'Status', 'Created At'
-        ])
-        
         # Display metrics
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Total Bookings", len(df))
+            st.metric("Total Bookings", summary['total'])
         
         with col2:
-            confirmed = len(df[df['Status'] == 'confirmed'])
-            st.metric("Confirmed", confirmed)
+            st.metric("Confirmed", summary['confirmed'])
         
         with col3:
-            unique_customers = df['Email'].nunique()
-            st.metric("Unique Customers", unique_customers)
+            st.metric("Unique Customers", summary['customers'])
         
         with col4:
-            today_bookings = df[df['Date'] == pd.Timestamp.now().strftime('%Y-%m-%d')]
-            st.metric("Today's Bookings", len(today_bookings))
+            st.metric("Today's Bookings", summary['today'])
         
         st.markdown("---")
         
         # Filters
         st.subheader("🔍 Filters")
-        col1, col2, col3 = st.columns(3)
+        col1, col2, col3 = st.columns([2, 1, 1])
         
         with col1:
-            search_name = st.text_input("Search by Name", "")
+            search_text = st.text_input("Search name, email, phone or notes", "")
         
         with col2:
-            search_email = st.text_input("Search by Email", "")
-        
-        with col3:
             search_date = st.text_input("Search by Date (YYYY-MM-DD)", "")
         
-        # Apply filters
-        filtered_df = df.copy()
-        
-        if search_name:
-            filtered_df = filtered_df[filtered_df['Customer Name'].str.contains(search_name, case=False, na=False)]
-        
-        if search_email:
-            filtered_df = filtered_df[filtered_df['Email'].str.contains(search_email, case=False, na=False)]
+        with col3:
+            search_service = st.selectbox("Service", ["All services"] + service_catalog.names())
         
-        if search_date:
-            filtered_df = filtered_df[filtered_df['Date'].str.contains(search_date, na=False)]
+        # Apply filters; text search runs in the database, best match first
+        if search_text:
+            results = search_bookings(search_text, limit=500)
+            matches = pd.DataFrame(
+                [[r['booking_id'], r['name'], r['email'], r['phone'], r['booking_type'],
+                  r['date'], r['time'], r['status'], r['created_at']] for r in results],
+                columns=COLUMNS
+            )
+            matches['Created At'] = pd.to_datetime(matches['Created At'])
+            if search_date:
+                matches = matches[matches['Date'].str.contains(search_date, na=False, regex=False)]
+            if search_service != "All services":
+                matches = matches[matches['Service Type'] == search_service]
+            n_records = len(matches)
+        else:
+            n_records = count_bookings(session, search_date, search_service)
         
         st.markdown("---")
         
         # Display bookings
-        st.subheader(f"📋 Bookings ({len(filtered_df)} records)")
+        st.subheader(f"📋 Bookings ({n_records} records)")
+        n_pages = max(1, -(-n_records // ADMIN_PAGE_SIZE))
+        page = int(st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1))
+        if search_text:
+            page_df = matches.iloc[(page - 1) * ADMIN_PAGE_SIZE:page * ADMIN_PAGE_SIZE]
+        else:
+            page_df = booking_page(session, search_date, search_service, page, ADMIN_PAGE_SIZE)
         
         # Style the dataframe
         st.dataframe(
-            filtered_df,
+            page_df,
             use_container_width=True,
             hide_index=True,
             column_config={
@@ -103,24 +147,35 @@ def show_admin_dashboard():
             }
         )
         
-        # Export option
+        # Export option: every matching booking, read only when asked for
         st.markdown("---")
         st.subheader("📥 Export Data")
         
-        csv = filtered_df.to_csv(index=False)
-        st.download_button(
-            label="Download as CSV",
-            data=csv,
-            file_name="bookings_export.csv",
-            mime="text/csv"
-        )
+        if st.button("Prepare CSV export"):
+            if search_text:
+                export_df = matches
+            else:
+                query = filter_bookings(session.query(*LISTING).join(Customer), search_date, search_service)
+                export_df = pd.DataFrame(query.order_by(Booking.created_at.desc()).all(), columns=COLUMNS)
+            st.download_button(
+                label="Download as CSV",
+                data=export_df.to_csv(index=False),
+                file_name="bookings_export.csv",
+                mime="text/csv"
+            )
         
         # Service-wise statistics
         st.markdown("---")
         st.subheader("📊 Service Statistics")
         
-        service_counts = df['Service Type'].value_counts()
-        st.bar_chart(service_counts)
+        st.bar_chart(summary['services'])
+        
+        with st.expander("Service catalog"):
+            st.dataframe(
+                pd.DataFrame(service_catalog.services()).drop(columns=['aliases']),
+                use_container_width=True,
+                hide_index=True
+            )
         
     except Exception as e:
         st.error(f"Error loading bookings: {str(e)}")
@@ -158,4 +213,117 @@ def show_booking_details(booking_id: int):
             st.warning(f"Booking #{booking_id} not found")
     
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
+
+def show_capacity_planning():
+    """Occupancy heatmaps and demand forecasts per service / branch"""
+    st.markdown("---")
+    st.subheader("📈 Capacity Planning")
+
+    grouping = st.radio("Group by", ["All", "Service", "Branch"], horizontal=True)
+    by = None if grouping == "All" else grouping.lower()
+    report = booking_analytics.report(by)
+
+    if not report['occupancy']:
+        st.info("📭 No bookings to analyse yet.")
+        return
+
+    group = st.selectbox(grouping, list(report['occupancy'])) if by else "All"
+
+    st.write("**Occupancy by weekday and hour** (share of hourly capacity)")
+    heatmap = report['occupancy'][group]
+    st.dataframe(
+        heatmap,
+        use_container_width=True,
+        column_config={
+            hour: st.column_config.ProgressColumn(hour, min_value=0.0, max_value=1.0, format="%.2f")
+            for hour in heatmap.columns
+        }
+    )
+
+    st.write("**Daily demand** (7-day rolling mean and forecast)")
+    demand = pd.DataFrame({
+        'bookings': report['daily'][group],
+        '7-day mean': report['rolling'][group],
+    }).tail(90)
+    forecast = report['forecast'][group].rename('forecast')
+    st.line_chart(demand.join(forecast, how='outer'))
+
+def show_memory_panel(profiler):
+    """Per-subsystem and per-session memory, plus fastest-growing allocation sites"""
+    st.markdown("---")
+    st.subheader("🧠 Memory")
+
+    if profiler is None:
+        st.caption("Memory profiling is disabled. Set MEMORY_PROFILING=1 to record reports.")
+        return
+
+    if st.button("📸 Take memory report") or not profiler.history:
+        profiler.report()
+    report = profiler.history[-1]
+
+    mb = 1024 * 1024
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("RSS", f"{(report['rss_bytes'] or 0) / mb:.1f} MB")
+    with col2:
+        st.metric("Traced (Python)", f"{(report['traced_bytes'] or 0) / mb:.1f} MB")
+    with col3:
+        st.metric("Traced peak", f"{(report['traced_peak_bytes'] or 0) / mb:.1f} MB")
+
+    if len(profiler.history) > 1:
+        trend = pd.DataFrame(
+            [(r['timestamp'], (r['rss_bytes'] or 0) / mb, (r['traced_bytes'] or 0) / mb) for r in profiler.history],
+            columns=['time', 'RSS MB', 'traced MB']
+        )
+        trend['time'] = pd.to_datetime(trend['time'], unit='s')
+        st.line_chart(trend.set_index('time'))
+
+    st.write("**By subsystem**")
+    subsystems = pd.Series(report['subsystems'], name='MB') / mb
+    st.bar_chart(subsystems)
+
+    st.write("**Largest sessions**")
+    if report['sessions']:
+        st.dataframe(pd.DataFrame(report['sessions']), use_container_width=True, hide_index=True)
+    else:
+        st.caption("No sessions stored.")
+
+    st.write("**Fastest-growing allocation sites** (since the previous report)")
+    if report['growth']:
+        st.dataframe(pd.DataFrame(report['growth']), use_container_width=True, hide_index=True)
+    else:
+        st.caption("Take another report to compare against this one.")
+
+def show_trace_panel():
+    """Latency histograms per span from the local trace file"""
+    st.markdown("---")
+    st.subheader("⏱️ Latency Traces")
+
+    if not tracing.is_enabled():
+        st.caption("Tracing is disabled. Set TRACING_ENABLED=1 to record spans.")
+
+    spans = tracing.load_spans()
+    if not spans:
+        st.info(f"No spans recorded yet in {tracing.trace_file()}")
+        return
+
+    df = pd.DataFrame(spans, columns=['name', 'durationMs'])
+
+    # Percentile summary per span
+    summary = df.groupby('name')['durationMs'].describe(percentiles=[0.5, 0.95, 0.99])
+    summary = summary[['count', '50%', '95%', '99%', 'max']].rename(columns={
+        '50%': 'p50 ms', '95%': 'p95 ms', '99%': 'p99 ms', 'max': 'max ms'
+    })
+    st.dataframe(summary.sort_values('p95 ms', ascending=False), use_container_width=True)
+
+    span_name = st.selectbox("Span", sorted(df['name'].unique()))
+    durations = df.loc[df['name'] == span_name, 'durationMs'].to_numpy()
+
+    counts, edges = np.histogram(durations, bins=min(30, max(1, len(durations))))
+    histogram = pd.DataFrame(
+        {'spans': counts},
+        index=[f"{edge:.1f}" for edge in edges[:-1]]
+    )
+    histogram.index.name = 'ms'
+    st.bar_chart(histogram)
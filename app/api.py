@@ -0,0 +1,152 @@
+"""
+ASGI HTTP/WebSocket API over AssistantService.
+
+Run from the repo root (one worker serves many conversations):
+    uvicorn app.api:app --host 0.0.0.0 --port 8000
+
+Endpoints:
+    GET    /health
+    GET    /metrics                            -> micro-batch, reminder scheduler and DB pool stats
+    GET    /ready                              -> 503 until the warm-up finished
+    POST   /conversations?namespace=<branch>   -> {"conversation_id": ...}
+    GET    /conversations/{id}                 -> conversation snapshot
+    DELETE /conversations/{id}
+    POST   /conversations/{id}/messages        {"message": "..."} -> {"response": ...}
+    WS     /ws/conversations/{id}              send text, receive {"response": ...} or {"error": ...};
+                                               the id must come from POST /conversations
+    GET    /debug/memory?top=10                -> memory report (MEMORY_PROFILING=1)
+"""
+
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+
+from app.service import AssistantService, ConversationNotFound, InvalidNamespace
+from models.database import get_database
+
+
+# Application close code (4000-4999): the conversation does not exist
+WS_NOT_FOUND = 4404
+
+
+class MessageRequest(BaseModel):
+    message: str
+
+
+def create_app(service: Optional[AssistantService] = None) -> FastAPI:
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        from models import init_db
+        init_db()
+        app.state.service = service or AssistantService()
+        yield
+        app.state.service.shutdown()
+        await get_database().dispose_async()
+        get_database().dispose()
+
+    api = FastAPI(title="Glamour Salon Assistant API", lifespan=lifespan)
+
+    def get_service() -> AssistantService:
+        return api.state.service
+
+    @api.get("/health")
+    async def health():
+        # Constant time: counting conversations can scan the whole store (Redis)
+        return {"status": "ok"}
+
+    @api.get("/metrics")
+    def metrics():
+        service = get_service()
+        return {
+            # Cached gauge: refreshed at most every CONVERSATION_COUNT_INTERVAL seconds
+            "conversations": service.conversation_count(),
+            "query_batcher": service.rag_pipeline.query_batch_metrics(),
+            "reminders": service.reminder_scheduler.metrics() if service.reminder_scheduler else None,
+            "database": get_database().pool_status(),
+        }
+
+    # Plain def: a report walks the heap, so it runs in the threadpool, off the event loop
+    @api.get("/debug/memory")
+    def memory_report(top: int = 10):
+        profiler = get_service().memory_profiler
+        if profiler is None:
+            raise HTTPException(status_code=404, detail="Memory profiling is disabled (MEMORY_PROFILING=1)")
+        return profiler.report(top=top)
+
+    @api.get("/ready")
+    async def ready():
+        service = get_service()
+        if not service.is_ready():
+            raise HTTPException(status_code=503, detail="Warming up")
+        return {"ready": True, "warmup_error": service.warmup_error}
+
+    # Plain def from here on: the session store and the database are blocking,
+    # so FastAPI runs these handlers in its threadpool, off the event loop
+    @api.post("/conversations", status_code=201)
+    def create_conversation(namespace: Optional[str] = None):
+        try:
+            state = get_service().create_conversation(namespace=namespace)
+        except InvalidNamespace as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        return {"conversation_id": state.conversation_id}
+
+    @api.get("/conversations/{conversation_id}")
+    def get_conversation(conversation_id: str):
+        try:
+            return get_service().get_conversation(conversation_id).snapshot()
+        except ConversationNotFound:
+            raise HTTPException(status_code=404, detail="Conversation not found")
+
+    @api.delete("/conversations/{conversation_id}", status_code=204)
+    def delete_conversation(conversation_id: str):
+        if not get_service().delete_conversation(conversation_id):
+            raise HTTPException(status_code=404, detail="Conversation not found")
+
+    @api.post("/conversations/{conversation_id}/messages")
+    def post_message(conversation_id: str, request: MessageRequest):
+        service = get_service()
+        try:
+            response = service.handle_message(conversation_id, request.message)
+        except ConversationNotFound:
+            raise HTTPException(status_code=404, detail="Conversation not found")
+        state = service.get_conversation(conversation_id)
+        return {"response": response, "booking_mode": state.booking_mode}
+
+    @api.websocket("/ws/conversations/{conversation_id}")
+    async def conversation_socket(websocket: WebSocket, conversation_id: str):
+        service = get_service()
+        await websocket.accept()
+        try:
+            # Ids are minted by POST /conversations; never create one the client made up
+            try:
+                await run_in_threadpool(service.get_conversation, conversation_id)
+            except ConversationNotFound:
+                await websocket.send_json({"error": "Conversation not found"})
+                await websocket.close(code=WS_NOT_FOUND)
+                return
+
+            while True:
+                message = await websocket.receive_text()
+                try:
+                    response = await service.handle_message_async(conversation_id, message)
+                    state = await run_in_threadpool(service.get_conversation, conversation_id)
+                except ConversationNotFound:
+                    # Deleted while the socket was open
+                    await websocket.send_json({"error": "Conversation not found"})
+                    await websocket.close(code=WS_NOT_FOUND)
+                    return
+                except Exception:
+                    # Like an HTTP 500: report the failed turn, keep the socket open
+                    await websocket.send_json({"error": "Could not process message"})
+                    continue
+                await websocket.send_json({"response": response, "booking_mode": state.booking_mode})
+        except WebSocketDisconnect:
+            pass
+
+    return api
+
+
+app = create_app()
@@ -1,22 +1,31 @@
 from typing import Dict, Optional, List
 import re
 from datetime import datetime
+from utils.customer_cache import CustomerCache, customer_cache
+from utils.service_catalog import ServiceCatalog, service_catalog
+from utils.tracing import traced
+from utils.validation import validate_field, validate_record, ValidationResult
 
 
 class BookingFlow:
     """Manages conversational booking flow with slot filling"""
 
-    def __init__(self):
+    def __init__(self, customer_lookup: Optional[CustomerCache] = None,
+                 catalog: Optional[ServiceCatalog] = None):
+        # Email and phone first: together they identify a returning customer
         self.required_fields = [
-            'name', 'email', 'phone', 'booking_type', 'date', 'time'
+            'email', 'phone', 'name', 'booking_type', 'date', 'time'
         ]
         self.booking_data: Dict[str, str] = {}
         self.confirmation_pending = False
+        self.customer_lookup = customer_lookup or customer_cache
+        self.catalog = catalog or service_catalog
 
     def reset(self):
         self.booking_data = {}
         self.confirmation_pending = False
 
+    @traced("booking.extract_info")
     def extract_info_from_message(self, message: str) -> Dict[str, str]:
         extracted = {}
         msg = message.strip()
@@ -25,7 +34,8 @@ class BookingFlow:
         # ----------------------
         # NAME (FIXED)
         # ----------------------
-        if 'name' not in self.booking_data:
+        # Messages with an email or digits carry other slots, not a name
+        if 'name' not in self.booking_data and '@' not in msg and not re.search(r'\d', msg):
             # Handles:
             # "Harshini"
             # "My name is Harshini"
@@ -75,29 +85,36 @@ class BookingFlow:
         # ----------------------
         # SERVICE
         # ----------------------
-        services = {
-            "bridal": "Bridal Makeup",
-            "party": "Party Makeup",
-            "color": "Hair Coloring",
-            "haircut": "Haircut",
-            "cut": "Haircut",
-            "manicure": "Manicure",
-            "pedicure": "Pedicure",
-            "facial": "Facial",
-            "massage": "Massage",
-            "spa": "Hair Spa",
-            "makeup": "Party Makeup"
-        }
-
-        for key, value in services.items():
-            if key in msg_lower:
-                extracted['booking_type'] = value
-                break
+        service = self.catalog.match(msg_lower)
+        if service:
+            extracted['booking_type'] = service
 
         return extracted
 
     def update_booking_data(self, new_data: Dict[str, str]):
-        self.booking_data.update(new_data)
+        # Only keep slots that pass validation so the question is re-asked
+        for field, value in new_data.items():
+            if validate_field(field, value).ok:
+                self.booking_data[field] = value
+
+        if ('email' in new_data or 'phone' in new_data) and not self.booking_data.get('name'):
+            self._prefill_returning_customer()
+
+    def _returning_customer(self) -> Optional[Dict[str, str]]:
+        """Stored profile, only once the customer gave both email and phone of one record.
+        Re-derived (cached) on each call: the flow is rebuilt from booking_data every turn"""
+        email, phone = self.booking_data.get('email'), self.booking_data.get('phone')
+        if not email or not phone:
+            return None
+        return self.customer_lookup.lookup(email=email, phone=phone)
+
+    def _prefill_returning_customer(self):
+        profile = self._returning_customer()
+        if profile is not None:
+            self.booking_data['name'] = profile['name']
+
+    def validate(self) -> ValidationResult:
+        return validate_record(self.booking_data)
 
     def get_missing_fields(self) -> List[str]:
         return [
@@ -113,14 +130,17 @@ class BookingFlow:
         if not missing:
             return None
 
+        service_question = f"Which service would you like? ({', '.join(self.catalog.names())})"
+        if missing[0] == 'booking_type':
+            profile = self._returning_customer()
+            if profile and profile.get('last_service') in self.catalog.names():
+                service_question += f" Last time you booked {profile['last_service']}."
+
         questions = {
             'name': "What's your name?",
             'email': "What's your email address?",
-            'phone': "What's your phone number? (10 digits)",
-            'booking_type': (
-                "Which service would you like? "
-                "(Haircut, Hair Coloring, Manicure, Pedicure, Facial, Massage, Hair Spa, Bridal Makeup, Party Makeup)"
-            ),
+            'phone': "What's your phone number? (10 digits; if you've booked with us before, we'll fill in your name)",
+            'booking_type': service_question,
             'date': "What date would you prefer? (YYYY-MM-DD)",
             'time': "What time works for you? (HH:MM)"
         }
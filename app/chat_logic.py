@@ -1,14 +1,18 @@
 from typing import List, Dict
-import streamlit as st
 from groq import Groq
 from config import MAX_CONVERSATION_HISTORY
+from utils.tracing import traced
 
 
 class ChatLogic:
     """Manages conversation flow and intent detection using Groq"""
 
-    def __init__(self):
-        self.client = Groq(api_key=st.secrets["GROQ_API_KEY"])
+    def __init__(self, client=None):
+        # Any object with Groq's chat.completions.create() interface works
+        if client is None:
+            import streamlit as st
+            client = Groq(api_key=st.secrets["GROQ_API_KEY"])
+        self.client = client
         self.model = "llama-3.1-8b-instant"
         self.conversation_history: List[Dict] = []
         self.max_history = MAX_CONVERSATION_HISTORY
@@ -45,6 +49,7 @@ class ChatLogic:
 
         return "general"
 
+    @traced("llm.generate_response")
     def generate_response(
         self,
         user_message: str,
@@ -0,0 +1,122 @@
+from typing import Any
+from utils.tracing import traced
+
+
+@traced("chat.turn")
+def process_message(state: Any, user_message: str) -> str:
+    """
+    Process user message and generate response.
+
+    `state` is any object exposing booking_mode, booking_flow, chat_logic
+    and booking_tools as attributes - a ConversationState in the app, a plain
+    namespace in headless benchmarks.
+    """
+    
+    # Check for confirmation in booking mode
+    if state.booking_mode and state.booking_flow.confirmation_pending:
+        user_lower = user_message.lower().strip()
+        
+        if user_lower in ['yes', 'y', 'confirm', 'correct', 'yeah', 'yep']:
+            # Confirm and save booking
+            booking_data = state.booking_flow.booking_data
+            
+            # Save to database, tagged with the branch the customer chose
+            result = state.booking_tools.booking_persistence_tool(
+                {**booking_data, 'branch': getattr(state, "namespace", None)}
+            )
+            
+            if result['success']:
+                booking_id = result['booking_id']
+                
+                # Send email
+                email_result = state.booking_tools.email_tool(
+                    to_email=booking_data['email'],
+                    customer_name=booking_data['name'],
+                    booking_id=booking_id,
+                    booking_type=booking_data['booking_type'],
+                    date=booking_data['date'],
+                    time=booking_data['time']
+                )
+                
+                # Reset booking flow
+                state.booking_mode = False
+                state.booking_flow.reset()
+                
+                response = f"""✅ **Booking Confirmed!**
+
+Your appointment has been successfully booked!
+
+**Booking ID:** #{booking_id}
+**Service:** {booking_data['booking_type']}
+**Date:** {booking_data['date']}
+**Time:** {booking_data['time']}
+
+{email_result['message']}
+
+We look forward to seeing you! 💅"""
+                
+                return response
+            else:
+                return f"❌ Sorry, there was an error saving your booking: {result['message']}\n\nPlease try again."
+        
+        elif user_lower in ['no', 'n', 'incorrect', 'wrong', 'nope']:
+            state.booking_flow.reset()
+            state.booking_flow.confirmation_pending = False
+            return "No problem! Let's start over. What would you like to change?"
+        
+        else:
+            return "Please reply with 'yes' to confirm or 'no' to make changes."
+    
+    # Check if in booking mode
+    if state.booking_mode:
+        # Extract information from message
+        extracted = state.booking_flow.extract_info_from_message(user_message)
+        
+        if extracted:
+            state.booking_flow.update_booking_data(extracted)
+        
+        # Check if all fields are collected
+        if state.booking_flow.is_complete():
+            state.booking_flow.confirmation_pending = True
+            return state.booking_flow.get_confirmation_summary()
+        else:
+            # Ask for missing information
+            next_question = state.booking_flow.get_next_question()
+            return next_question
+    
+    # Detect intent
+    intent = state.chat_logic.detect_intent(user_message)
+    
+    if intent == 'booking':
+        state.booking_mode = True
+        extracted = state.booking_flow.extract_info_from_message(user_message)
+        if extracted:
+            state.booking_flow.update_booking_data(extracted)
+        
+        if state.booking_flow.is_complete():
+            state.booking_flow.confirmation_pending = True
+            return state.booking_flow.get_confirmation_summary()
+        else:
+            next_question = state.booking_flow.get_next_question()
+            return f"Perfect! Let me help you book an appointment. {next_question}"
+    
+    elif intent == 'question':
+        # Try RAG
+        rag_result = state.booking_tools.rag_tool(
+            user_message, namespace=getattr(state, "namespace", None)
+        )
+        
+        if rag_result['success'] and rag_result['answer']:
+            # Generate response with RAG context
+            response = state.chat_logic.generate_response(
+                user_message,
+                rag_context=rag_result['answer']
+            )
+            return response
+        else:
+            # No RAG context, generate regular response
+            return state.chat_logic.generate_response(user_message)
+    
+    else:
+        # General conversation
+        return state.chat_logic.generate_response(user_message)
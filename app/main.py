@@ -1,3 +1,6 @@
+import time
+_script_start = time.perf_counter()
+
 import streamlit as st
 import sys
 from pathlib import Path
@@ -5,13 +8,12 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from groq import Groq
 from models import init_db
-from utils.rag_pipeline import RAGPipeline
-from utils.tools import BookingTools
-from app.chat_logic import ChatLogic
-from app.booking_flow import BookingFlow
-from app.admin_dashboard import show_admin_dashboard
-from config import SALON_SERVICES, UPLOAD_DIR
+from app.service import AssistantService
+from config import DEFAULT_NAMESPACE, STARTUP_PROFILE, TIME_TO_FIRST_RENDER_TARGET_MS, UPLOAD_DIR
+from utils.tracing import span
+from utils.service_catalog import service_catalog
 import os
 
 # Page configuration
@@ -22,6 +24,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Measures the whole script run; ended before st.rerun() and at the footer
+rerun_span = span("streamlit.rerun")
+
 # Custom CSS
 st.markdown("""
 <style>
@@ -51,128 +56,20 @@ st.markdown("""
 # Initialize database
 init_db()
 
-# DEFINE FUNCTION FIRST - BEFORE IT'S CALLED
-def process_message(user_message: str) -> str:
-    """Process user message and generate response"""
-    
-    # Check for confirmation in booking mode
-    if st.session_state.booking_mode and st.session_state.booking_flow.confirmation_pending:
-        user_lower = user_message.lower().strip()
-        
-        if user_lower in ['yes', 'y', 'confirm', 'correct', 'yeah', 'yep']:
-            # Confirm and save booking
-            booking_data = st.session_state.booking_flow.booking_data
-            
-            # Save to database
-            result = st.session_state.booking_tools.booking_persistence_tool(booking_data)
-            
-            if result['success']:
-                booking_id = result['booking_id']
-                
-                # Send email
-                email_result = st.session_state.booking_tools.email_tool(
-                    to_email=booking_data['email'],
-                    customer_name=booking_data['name'],
-                    booking_id=booking_id,
-                    booking_type=booking_data['booking_type'],
-                    date=booking_data['date'],
-                    time=booking_data['time']
-                )
-                
-                # Reset booking flow
-                st.session_state.booking_mode = False
-                st.session_state.booking_flow.reset()
-                
-                response = f"""✅ **Booking Confirmed!**
-
-Your appointment has been successfully booked!
+@st.cache_resource
+def get_service() -> AssistantService:
+    """One service (model, index, LLM client) shared by all sessions of this process"""
+    return AssistantService(llm_client=Groq(api_key=st.secrets["GROQ_API_KEY"]))
 
-**Booking ID:** #{booking_id}
-**Service:** {booking_data['booking_type']}
-**Date:** {booking_data['date']}
-**Time:** {booking_data['time']}
-
-{email_result['message']}
-
-We look forward to seeing you! 💅"""
-                
-                return response
-            else:
-                return f"❌ Sorry, there was an error saving your booking: {result['message']}\n\nPlease try again."
-        
-        elif user_lower in ['no', 'n', 'incorrect', 'wrong', 'nope']:
-            st.session_state.booking_flow.reset()
-            st.session_state.booking_flow.confirmation_pending = False
-            return "No problem! Let's start over. What would you like to change?"
-        
-        else:
-            return "Please reply with 'yes' to confirm or 'no' to make changes."
-    
-    # Check if in booking mode
-    if st.session_state.booking_mode:
-        # Extract information from message
-        extracted = st.session_state.booking_flow.extract_info_from_message(user_message)
-        
-        if extracted:
-            st.session_state.booking_flow.update_booking_data(extracted)
-        
-        # Check if all fields are collected
-        if st.session_state.booking_flow.is_complete():
-            st.session_state.booking_flow.confirmation_pending = True
-            return st.session_state.booking_flow.get_confirmation_summary()
-        else:
-            # Ask for missing information
-            next_question = st.session_state.booking_flow.get_next_question()
-            return next_question
-    
-    # Detect intent
-    intent = st.session_state.chat_logic.detect_intent(user_message)
-    
-    if intent == 'booking':
-        st.session_state.booking_mode = True
-        extracted = st.session_state.booking_flow.extract_info_from_message(user_message)
-        if extracted:
-            st.session_state.booking_flow.update_booking_data(extracted)
-        
-        if st.session_state.booking_flow.is_complete():
-            st.session_state.booking_flow.confirmation_pending = True
-            return st.session_state.booking_flow.get_confirmation_summary()
-        else:
-            next_question = st.session_state.booking_flow.get_next_question()
-            return f"Perfect! Let me help you book an appointment. {next_question}"
-    
-    elif intent == 'question':
-        # Try RAG
-        rag_result = st.session_state.booking_tools.rag_tool(user_message)
-        
-        if rag_result['success'] and rag_result['answer']:
-            # Generate response with RAG context
-            response = st.session_state.chat_logic.generate_response(
-                user_message,
-                rag_context=rag_result['answer']
-            )
-            return response
-        else:
-            # No RAG context, generate regular response
-            return st.session_state.chat_logic.generate_response(user_message)
-    
-    else:
-        # General conversation
-        return st.session_state.chat_logic.generate_response(user_message)
+service = get_service()
 
-# Initialize session state
+# Initialize session state - only the conversation id lives in Streamlit
 if 'initialized' not in st.session_state:
     st.session_state.initialized = True
-    st.session_state.messages = []
-    st.session_state.booking_mode = False
-    st.session_state.booking_flow = BookingFlow()
     st.session_state.page = "chat"
-    
-    st.session_state.chat_logic = ChatLogic()
-    
-    st.session_state.rag_pipeline = RAGPipeline()
-    st.session_state.booking_tools = BookingTools(st.session_state.rag_pipeline)
+    st.session_state.conversation_id = service.create_conversation().conversation_id
 
+conversation = service.get_or_create_conversation(st.session_state.conversation_id)
     
 # Sidebar
 with st.sidebar:
@@ -198,6 +95,11 @@ with st.sidebar:
         accept_multiple_files=True,
         key="pdf_uploader"
     )
+    upload_namespace = st.text_input(
+        "Branch / collection",
+        value=DEFAULT_NAMESPACE,
+        help="Documents are indexed per branch; letters, digits, '-' or '_'"
+    )
     
     if uploaded_files:
         if st.button("Process PDFs", type="primary"):
@@ -211,37 +113,54 @@ with st.sidebar:
                     pdf_paths.append(str(file_path))
                 
                 # Process PDFs
-                success = st.session_state.rag_pipeline.process_pdfs(pdf_paths)
+                try:
+                    success = service.rag_pipeline.process_pdfs(pdf_paths, namespace=upload_namespace)
+                except ValueError as e:
+                    success = False
+                    st.error(str(e))
                 
                 if success:
+                    stats = service.rag_pipeline.last_ingest_stats
                     st.success(f"✅ Processed {len(uploaded_files)} PDF(s) successfully!")
+                    st.caption(
+                        f"{stats['indexed']} chunks indexed from {stats['pages']} pages, "
+                        f"{stats['duplicates_removed']} near-duplicates removed"
+                    )
                 else:
                     st.error("❌ Error processing PDFs")
     
+    # Which shard this conversation searches
+    branch_options = ["All branches"] + service.rag_pipeline.namespaces()
+    current = conversation.namespace if conversation.namespace in branch_options else "All branches"
+    selected = st.selectbox("Search documents for", branch_options, index=branch_options.index(current))
+    selected_namespace = None if selected == "All branches" else selected
+    if selected_namespace != conversation.namespace:
+        service.set_namespace(conversation.conversation_id, selected_namespace)
+        conversation.namespace = selected_namespace
+    
     st.markdown("---")
     
     # Quick Actions
     st.markdown("### ⚡ Quick Actions")
     
     if st.button("🆕 Start New Booking"):
-        st.session_state.booking_mode = True
-        st.session_state.booking_flow.reset()
-        st.session_state.messages.append({
-            "role": "assistant",
-            "content": "Great! Let's book your appointment. Which service would you like?\n\n" + 
-                      "\n".join([f"• {service}" for service in SALON_SERVICES])
-        })
+        service.start_booking(
+            conversation.conversation_id,
+            "Great! Let's book your appointment. Which service would you like?\n\n" +
+            "\n".join([f"• {name}" for name in service_catalog.names()])
+        )
+        rerun_span.end()
         st.rerun()
     
     if st.button("🗑️ Clear Chat"):
-        st.session_state.messages = []
-        st.session_state.booking_mode = False
-        st.session_state.booking_flow.reset()
-        st.session_state.chat_logic.clear_history()
+        service.clear_conversation(conversation.conversation_id)
+        rerun_span.end()
         st.rerun()
     
     st.markdown("---")
     st.caption("💡 Tip: Upload salon documents to enable RAG-based Q&A")
+    if not service.is_ready():
+        st.caption("⏳ Loading document search in the background...")
 
 # Main content area
 if page == "💬 Chat & Booking":
@@ -254,33 +173,34 @@ if page == "💬 Chat & Booking":
     
     with chat_container:
         # Display chat messages
-        for message in st.session_state.messages:
+        for message in conversation.messages:
             with st.chat_message(message["role"]):
                 st.markdown(message["content"])
     
     # Chat input
     if prompt := st.chat_input("Type your message here..."):
-        # Add user message
-        st.session_state.messages.append({"role": "user", "content": prompt})
-        st.session_state.chat_logic.add_message("user", prompt)
-        
         with st.chat_message("user"):
             st.markdown(prompt)
         
-        # Process message - NOW THIS FUNCTION EXISTS!
+        # Process message
         with st.chat_message("assistant"):
             with st.spinner("Thinking..."):
-                response = process_message(prompt)
+                # Records both messages in the conversation state
+                response = service.handle_message(conversation.conversation_id, prompt)
                 st.markdown(response)
         
-        # Add assistant message
-        st.session_state.messages.append({"role": "assistant", "content": response})
-        st.session_state.chat_logic.add_message("assistant", response)
-        
+        rerun_span.end()
         st.rerun()
 
 else:  # Admin Dashboard
+    # pandas is only needed here; keep it off the chat page's import path
+    from app.admin_dashboard import (
+        show_admin_dashboard, show_capacity_planning, show_memory_panel, show_trace_panel
+    )
     show_admin_dashboard()
+    show_capacity_planning()
+    show_memory_panel(service.memory_profiler)
+    show_trace_panel()
 
 # Footer
 st.markdown("---")
@@ -289,4 +209,11 @@ st.markdown(
     "💅 Glamour Salon AI Booking Assistant | Powered by Streamlit"
     "</div>",
     unsafe_allow_html=True
-)
\ No newline at end of file
+)
+
+if STARTUP_PROFILE:
+    render_ms = (time.perf_counter() - _script_start) * 1000
+    status = "✅" if render_ms <= TIME_TO_FIRST_RENDER_TARGET_MS else "⚠️"
+    st.caption(f"{status} Script run: {render_ms:.0f} ms (target {TIME_TO_FIRST_RENDER_TARGET_MS} ms)")
+
+rerun_span.end()
@@ -0,0 +1,287 @@
+"""
+Framework-independent assistant service.
+
+Owns the per-process resources (RAG pipeline, booking tools, LLM client).
+Conversation state lives in a SessionStore, so any worker can serve any
+conversation. Streamlit (app/main.py) and the ASGI API (app/api.py) are
+both thin clients of this class.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.booking_flow import BookingFlow
+from app.chat_logic import ChatLogic
+from app.conversation import process_message
+from config import (
+    CONVERSATION_COUNT_INTERVAL,
+    MEMORY_PROFILING,
+    REMINDERS_ENABLED,
+    SESSION_MAX_MESSAGES,
+    WARMUP_ON_START,
+)
+from utils.memory import MemoryProfiler, deep_sizeof
+from utils.rag_pipeline import NAMESPACE_RE, RAGPipeline
+from utils.reminders import ReminderScheduler
+from utils.session_store import SessionStore, create_session_store
+from utils.tools import BookingTools
+
+
+@dataclass
+class ConversationState:
+    """Everything process_message needs for one conversation"""
+    conversation_id: str
+    chat_logic: ChatLogic
+    booking_tools: BookingTools
+    booking_flow: BookingFlow = field(default_factory=BookingFlow)
+    booking_mode: bool = False
+    # Vector index shard (branch) to search; None fans out over all shards
+    namespace: Optional[str] = None
+    messages: List[Dict[str, str]] = field(default_factory=list)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "conversation_id": self.conversation_id,
+            "booking_mode": self.booking_mode,
+            "namespace": self.namespace,
+            "booking_data": dict(self.booking_flow.booking_data),
+            "confirmation_pending": self.booking_flow.confirmation_pending,
+            "messages": list(self.messages),
+        }
+
+    def to_dict(self, max_messages: int = SESSION_MAX_MESSAGES) -> Dict[str, Any]:
+        """Compact form for the session store; keeps only recent messages"""
+        return {
+            "b": self.booking_mode,
+            "n": self.namespace,
+            "d": self.booking_flow.booking_data,
+            "c": self.booking_flow.confirmation_pending,
+            "m": [[m["role"][0], m["content"]] for m in self.messages[-max_messages:]],
+            "h": [[m["role"][0], m["content"]] for m in self.chat_logic.conversation_history],
+        }
+
+    @classmethod
+    def from_dict(cls, conversation_id: str, data: Dict[str, Any], chat_logic: ChatLogic,
+                  booking_tools: BookingTools) -> "ConversationState":
+        state = cls(conversation_id=conversation_id, chat_logic=chat_logic, booking_tools=booking_tools)
+        state.booking_mode = data["b"]
+        state.namespace = data.get("n")
+        state.booking_flow.booking_data = data["d"]
+        state.booking_flow.confirmation_pending = data["c"]
+        state.messages = [{"role": _ROLES[r], "content": c} for r, c in data["m"]]
+        chat_logic.conversation_history = [{"role": _ROLES[r], "content": c} for r, c in data["h"]]
+        return state
+
+
+_ROLES = {"u": "user", "a": "assistant", "s": "system"}
+
+
+class ConversationNotFound(KeyError):
+    pass
+
+
+class InvalidNamespace(ValueError):
+    pass
+
+
+def check_namespace(namespace: Optional[str]) -> Optional[str]:
+    """Namespaces name index shards on disk: letters, digits, '-' or '_'"""
+    if namespace is not None and not NAMESPACE_RE.fullmatch(namespace):
+        raise InvalidNamespace(f"Invalid namespace '{namespace}'. Use letters, digits, '-' or '_'.")
+    return namespace
+
+
+class AssistantService:
+    """Runs conversations for any number of concurrent users in one process"""
+
+    def __init__(
+        self,
+        llm_client: Any = None,
+        rag_pipeline: Optional[RAGPipeline] = None,
+        store: Optional[SessionStore] = None,
+        max_workers: int = 16,
+        warm_up: bool = WARMUP_ON_START,
+        reminders: bool = REMINDERS_ENABLED,
+        memory_profiling: bool = MEMORY_PROFILING
+    ):
+        if llm_client is None:
+            from groq import Groq
+            from config import GROQ_API_KEY
+            llm_client = Groq(api_key=GROQ_API_KEY)
+        self.llm_client = llm_client
+
+        # Shared by every conversation: one model and index per process.
+        # Both load lazily on first use, or in the background warm-up.
+        self.rag_pipeline = rag_pipeline or RAGPipeline()
+        self.reminder_scheduler = ReminderScheduler() if reminders else None
+        self.booking_tools = BookingTools(self.rag_pipeline, reminder_scheduler=self.reminder_scheduler)
+        if self.reminder_scheduler:
+            self.reminder_scheduler.start()
+
+        self.store = store or create_session_store()
+        # Striped locks serialize turns per conversation with bounded memory.
+        # They only cover this process: with a shared SQLite / Redis store,
+        # route a conversation's requests to one worker (sticky sessions) or
+        # concurrent turns on it may overwrite each other's state.
+        self._locks = [threading.Lock() for _ in range(64)]
+        self._count_lock = threading.Lock()
+        self._count: Optional[int] = None
+        self._count_expires = 0.0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="assistant")
+
+        self.memory_profiler = self._start_memory_profiler() if memory_profiling else None
+
+        self._ready = threading.Event()
+        self.warmup_error: Optional[str] = None
+        if warm_up:
+            threading.Thread(target=self._warm_up, name="assistant-warmup", daemon=True).start()
+        else:
+            self._ready.set()
+
+    def _start_memory_profiler(self) -> MemoryProfiler:
+        from utils.customer_cache import customer_cache
+        from utils.service_catalog import service_catalog
+
+        profiler = MemoryProfiler()
+        profiler.register("rag_pipeline", self.rag_pipeline.memory_usage)
+        profiler.register_object("session_store", self.store)
+        profiler.register_object("customer_cache", customer_cache)
+        profiler.register_object("service_catalog", service_catalog)
+        if self.reminder_scheduler:
+            profiler.register_object("reminders", self.reminder_scheduler)
+        # Only loaded once someone opens the admin dashboard
+        profiler.register("analytics", lambda: (
+            deep_sizeof(sys.modules["utils.analytics"].booking_analytics)
+            if "utils.analytics" in sys.modules else 0
+        ))
+        profiler.watch_sessions(self.store)
+        profiler.start()
+        return profiler
+
+    # -----------------------------
+    # Readiness
+    # -----------------------------
+    def _warm_up(self):
+        try:
+            self.rag_pipeline.warm_up()
+        except Exception as e:
+            # Retrieval still loads lazily on the first question
+            self.warmup_error = str(e)
+        finally:
+            self._ready.set()
+
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    # -----------------------------
+    # Conversation registry
+    # -----------------------------
+    def _lock_for(self, conversation_id: str) -> threading.Lock:
+        return self._locks[hash(conversation_id) % len(self._locks)]
+
+    def _new_state(self, conversation_id: str) -> ConversationState:
+        return ConversationState(
+            conversation_id=conversation_id,
+            chat_logic=ChatLogic(client=self.llm_client),
+            booking_tools=self.booking_tools,
+        )
+
+    def save_conversation(self, state: ConversationState) -> None:
+        self.store.put(state.conversation_id, state.to_dict())
+
+    def create_conversation(self, conversation_id: Optional[str] = None,
+                            namespace: Optional[str] = None) -> ConversationState:
+        state = self._new_state(conversation_id or uuid.uuid4().hex)
+        state.namespace = check_namespace(namespace)
+        self.save_conversation(state)
+        return state
+
+    def get_conversation(self, conversation_id: str) -> ConversationState:
+        data = self.store.get(conversation_id)
+        if data is None:
+            raise ConversationNotFound(conversation_id)
+        return ConversationState.from_dict(
+            conversation_id, data,
+            chat_logic=ChatLogic(client=self.llm_client),
+            booking_tools=self.booking_tools,
+        )
+
+    def get_or_create_conversation(self, conversation_id: str) -> ConversationState:
+        try:
+            return self.get_conversation(conversation_id)
+        except ConversationNotFound:
+            return self.create_conversation(conversation_id)
+
+    def delete_conversation(self, conversation_id: str) -> bool:
+        return self.store.delete(conversation_id)
+
+    def conversation_count(self) -> int:
+        """Stored conversations, recounted at most every CONVERSATION_COUNT_INTERVAL
+        seconds: counting can scan the whole store (Redis SCAN)"""
+        with self._count_lock:
+            if self._count is None or time.monotonic() >= self._count_expires:
+                self._count = self.store.count()
+                self._count_expires = time.monotonic() + CONVERSATION_COUNT_INTERVAL
+            return self._count
+
+    # -----------------------------
+    # Conversation actions
+    # -----------------------------
+    def handle_message(self, conversation_id: str, user_message: str) -> str:
+        """Run one chat turn; turns within a conversation are serialized"""
+        with self._lock_for(conversation_id):
+            state = self.get_conversation(conversation_id)
+            state.messages.append({"role": "user", "content": user_message})
+            state.chat_logic.add_message("user", user_message)
+
+            response = process_message(state, user_message)
+
+            state.messages.append({"role": "assistant", "content": response})
+            state.chat_logic.add_message("assistant", response)
+            self.save_conversation(state)
+        return response
+
+    async def handle_message_async(self, conversation_id: str, user_message: str) -> str:
+        """Async wrapper: the LLM, embedding and DB calls are blocking"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self.handle_message, conversation_id, user_message
+        )
+
+    def start_booking(self, conversation_id: str, prompt: str) -> None:
+        with self._lock_for(conversation_id):
+            state = self.get_conversation(conversation_id)
+            state.booking_mode = True
+            state.booking_flow.reset()
+            state.messages.append({"role": "assistant", "content": prompt})
+            self.save_conversation(state)
+
+    def set_namespace(self, conversation_id: str, namespace: Optional[str]) -> None:
+        check_namespace(namespace)
+        with self._lock_for(conversation_id):
+            state = self.get_conversation(conversation_id)
+            state.namespace = namespace
+            self.save_conversation(state)
+
+    def clear_conversation(self, conversation_id: str) -> None:
+        with self._lock_for(conversation_id):
+            namespace = self.get_conversation(conversation_id).namespace
+            state = self._new_state(conversation_id)
+            state.namespace = namespace
+            self.save_conversation(state)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+        if self.reminder_scheduler:
+            self.reminder_scheduler.stop()
+        if self.memory_profiler:
+            self.memory_profiler.stop()
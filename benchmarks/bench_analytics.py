@@ -0,0 +1,85 @@
+"""
+Benchmark for utils.analytics on synthetic booking history: occupancy
+heatmaps, daily demand and forecasts, overall and per service / branch.
+
+Run from the repo root:
+    python -m benchmarks.bench_analytics --years 3 --per-day 200
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from config import SALON_SERVICES
+from utils.analytics import daily_demand, forecast_demand, occupancy, rolling_demand
+
+
+def make_bookings(years: float, per_day: int, branches: int, seed: int = 0) -> pd.DataFrame:
+    """Columnar bookings shaped like load_bookings() output"""
+    rng = np.random.default_rng(seed)
+    n_days = int(years * 365)
+    n = n_days * per_day
+
+    start = np.datetime64('2023-01-01T00:00', 'm')
+    day = rng.integers(0, n_days, n)
+    hour = rng.integers(9, 20, n)
+    minute = rng.choice([0, 15, 30, 45], n)
+    starts_at = start + (day * 24 * 60 + hour * 60 + minute).astype('timedelta64[m]')
+
+    services = np.array([s["name"] for s in SALON_SERVICES])
+    branch_names = np.array(["default"] + [f"branch-{i}" for i in range(1, branches)])
+    return pd.DataFrame({
+        'starts_at': pd.to_datetime(starts_at),
+        'service': pd.Categorical(services[rng.integers(0, len(services), n)]),
+        'branch': pd.Categorical(branch_names[rng.integers(0, len(branch_names), n)]),
+        'status': 'confirmed',
+    })
+
+
+def full_report(frame: pd.DataFrame):
+    # The synthetic history ends in the past: cut it at its own last day
+    until = frame['starts_at'].max().date()
+    for by in (None, 'service', 'branch'):
+        daily = daily_demand(frame, by, until=until)
+        occupancy(frame, by)
+        rolling_demand(daily)
+        forecast_demand(daily)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--per-day", type=int, default=200)
+    parser.add_argument("--branches", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--target-ms", type=float, default=1000.0,
+                        help="fail if the full report (all groupings) is slower")
+    args = parser.parse_args()
+
+    frame = make_bookings(args.years, args.per_day, args.branches)
+    full_report(frame)  # first call pays for lazy imports / allocations
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        full_report(frame)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    best, median = min(timings), sorted(timings)[len(timings) // 2]
+    print(f"bookings: {len(frame):,}  ({args.years:g} years x {args.per_day}/day, {args.branches} branches)")
+    print(f"full report (overall + per service + per branch): best {best:.1f} ms, median {median:.1f} ms")
+    print(f"target: {args.target_ms:.0f} ms")
+
+    if median > args.target_ms:
+        print("FAIL: over target")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
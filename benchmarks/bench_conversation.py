@@ -0,0 +1,254 @@
+"""
+End-to-end conversation benchmark.
+
+Replays a JSONL conversation corpus through app.conversation.process_message
+with real ChatLogic / BookingFlow / BookingTools / RAGPipeline objects and a
+deterministic fake Groq client, outside Streamlit. Reports p50/p95/p99
+latency per stage and throughput for N concurrent simulated users, and
+exits non-zero when a stage regresses against a saved baseline.
+
+Run from the repo root:
+    python -m benchmarks.bench_conversation --users 10 --iterations 5
+    python -m benchmarks.bench_conversation --save-baseline bench_baseline.json
+    python -m benchmarks.bench_conversation --baseline bench_baseline.json --threshold 0.25
+
+Corpus format (one conversation per line); "{user}" in a turn is replaced
+with a per-user token so concurrent users do not collide on email:
+    {"conversation_id": "...", "turns": ["I want to book a haircut", ...]}
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+DEFAULT_CORPUS = Path(__file__).parent / "corpus" / "conversations.jsonl"
+STAGES = ["intent", "extraction", "retrieval", "llm", "db_write", "turn"]
+
+
+class StageTimer:
+    """Thread-safe collection of per-stage durations (seconds)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def record(self, stage: str, elapsed: float):
+        with self._lock:
+            self.samples[stage].append(elapsed)
+
+    def wrap(self, stage: str, fn):
+        @wraps(fn)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - start)
+        return timed
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def load_corpus(path: Path) -> List[Dict]:
+    conversations = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                conversations.append(json.loads(line))
+    return conversations
+
+
+def build_rag_pipeline(doc_paths: List[str], scratch_dir: Path):
+    from utils.chunking import chunk_pages, deduplicate
+    from utils.rag_pipeline import RAGPipeline
+
+    if doc_paths:
+        # Index plain-text docs in a scratch store; never touch the on-disk one
+        rag = RAGPipeline(store_dir=scratch_dir / "store")
+        pages = [(Path(path).name, 1, Path(path).read_text(encoding="utf-8")) for path in doc_paths]
+        chunks, _ = deduplicate(chunk_pages(pages))
+        rag._build_vector_store([c.text for c in chunks], [c.metadata() for c in chunks])
+    else:
+        rag = RAGPipeline()
+        rag.load_existing_vector_store()
+    return rag
+
+
+def make_state(rag_pipeline, timer: StageTimer, llm_latency_ms: float, llm_jitter_ms: float):
+    """Build a per-conversation state equivalent to Streamlit's session_state"""
+    from app.booking_flow import BookingFlow
+    from app.chat_logic import ChatLogic
+    from benchmarks.fake_llm import FakeGroq
+    from utils.tools import BookingTools
+
+    state = SimpleNamespace(
+        messages=[],
+        booking_mode=False,
+        booking_flow=BookingFlow(),
+        chat_logic=ChatLogic(client=FakeGroq(llm_latency_ms, llm_jitter_ms)),
+        booking_tools=BookingTools(rag_pipeline),
+    )
+
+    state.chat_logic.detect_intent = timer.wrap("intent", state.chat_logic.detect_intent)
+    state.chat_logic.generate_response = timer.wrap("llm", state.chat_logic.generate_response)
+    state.booking_flow.extract_info_from_message = timer.wrap(
+        "extraction", state.booking_flow.extract_info_from_message
+    )
+    state.booking_tools.rag_tool = timer.wrap("retrieval", state.booking_tools.rag_tool)
+    state.booking_tools.booking_persistence_tool = timer.wrap(
+        "db_write", state.booking_tools.booking_persistence_tool
+    )
+    return state
+
+
+def run_user(user_idx: int, conversations: List[Dict], iterations: int, rag_pipeline,
+             timer: StageTimer, llm_latency_ms: float, llm_jitter_ms: float) -> int:
+    from app.conversation import process_message
+
+    turns = 0
+    for iteration in range(iterations):
+        for conversation in conversations:
+            state = make_state(rag_pipeline, timer, llm_latency_ms, llm_jitter_ms)
+            token = f"{user_idx}-{iteration}"
+            for turn in conversation["turns"]:
+                prompt = turn.replace("{user}", token)
+                state.messages.append({"role": "user", "content": prompt})
+                state.chat_logic.add_message("user", prompt)
+
+                start = time.perf_counter()
+                response = process_message(state, prompt)
+                timer.record("turn", time.perf_counter() - start)
+
+                state.messages.append({"role": "assistant", "content": response})
+                state.chat_logic.add_message("assistant", response)
+                turns += 1
+    return turns
+
+
+def summarize(timer: StageTimer) -> Dict[str, Dict[str, float]]:
+    summary = {}
+    for stage in STAGES:
+        values = timer.samples.get(stage, [])
+        summary[stage] = {
+            "count": len(values),
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+        }
+    return summary
+
+
+def find_regressions(summary: Dict, baseline: Dict, threshold: float, metric: str,
+                     min_delta_ms: float) -> List[str]:
+    regressions = []
+    for stage, stats in summary.items():
+        base = baseline.get("stages", {}).get(stage)
+        if not base or not stats["count"] or not base.get(metric):
+            continue
+        limit = base[metric] * (1 + threshold)
+        # Ignore sub-millisecond noise on pure-Python stages
+        if stats[metric] > limit and stats[metric] - base[metric] > min_delta_ms:
+            regressions.append(
+                f"{stage}: {metric} {stats[metric]:.2f}ms > {limit:.2f}ms "
+                f"(baseline {base[metric]:.2f}ms +{threshold:.0%})"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end conversation benchmark")
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--users", type=int, default=1, help="concurrent simulated users")
+    parser.add_argument("--iterations", type=int, default=3, help="corpus replays per user")
+    parser.add_argument("--llm-latency-ms", type=float, default=250.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=100.0)
+    parser.add_argument("--docs", nargs="*", default=[], help="plain-text files to index for retrieval")
+    parser.add_argument("--baseline", type=Path, help="fail if a stage regresses against this file")
+    parser.add_argument("--save-baseline", type=Path, help="write this run's stats as a baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                        help="absolute slack before a slower stage counts as a regression")
+    parser.add_argument("--metric", default="p95_ms", choices=["p50_ms", "p95_ms", "p99_ms"])
+    args = parser.parse_args()
+
+    # Throwaway database and index store, removed when the run ends
+    with tempfile.TemporaryDirectory(prefix="salon_bench_") as tmp_dir:
+        # Point the app at the database before config is imported
+        os.environ["DATABASE_URL"] = f"sqlite:///{tmp_dir}/bench.db"
+        try:
+            run(args, Path(tmp_dir))
+        finally:
+            from models.database import get_database
+            get_database().dispose()
+
+
+def run(args: argparse.Namespace, tmp_dir: Path):
+    from models import init_db
+    init_db()
+
+    conversations = load_corpus(args.corpus)
+    rag_pipeline = build_rag_pipeline(args.docs, tmp_dir)
+    timer = StageTimer()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        futures = [
+            pool.submit(
+                run_user, user_idx, conversations, args.iterations, rag_pipeline,
+                timer, args.llm_latency_ms, args.llm_jitter_ms
+            )
+            for user_idx in range(args.users)
+        ]
+        total_turns = sum(f.result() for f in futures)
+    wall = time.perf_counter() - start
+
+    summary = summarize(timer)
+    print(f"users: {args.users}  iterations: {args.iterations}  conversations: {len(conversations)}")
+    print(f"{'stage':<12}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for stage, stats in summary.items():
+        print(f"{stage:<12}{stats['count']:>8}{stats['p50_ms']:>10.2f}"
+              f"{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+    throughput = total_turns / wall if wall else 0.0
+    print(f"throughput: {throughput:.1f} turns/sec over {wall:.2f}s ({total_turns} turns)")
+
+    result = {"users": args.users, "throughput_tps": throughput, "stages": summary}
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(result, indent=2))
+        print(f"baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = find_regressions(
+            summary, baseline, args.threshold, args.metric, args.min_delta_ms
+        )
+        if regressions:
+            print("REGRESSIONS:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("no regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
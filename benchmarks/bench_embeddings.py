@@ -0,0 +1,129 @@
+"""
+Parity and throughput benchmark for the embedding backends.
+
+Compares each backend against the fp32 sentence-transformers reference:
+- cosine agreement: per-sentence cosine(reference, candidate), mean and min
+- retrieval overlap: share of the reference top-k passages the candidate
+  also returns for each query
+- throughput in sentences/sec for batch encoding, and single-query latency
+
+Run from the repo root:
+    python -m benchmarks.bench_embeddings --backends sentence-transformers onnx int8
+    python -m benchmarks.bench_embeddings --docs salon.txt --threads 4
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.embeddings import BACKENDS, SentenceTransformerBackend, create_embedding_backend
+
+SAMPLE_PASSAGES = [
+    "Our salon is open Monday to Saturday from 9am to 8pm.",
+    "A classic haircut takes 45 minutes and costs $35.",
+    "Hair coloring starts at $80 and includes a wash and blow-dry.",
+    "Manicures include nail shaping, cuticle care and polish.",
+    "Our spa pedicure includes a foot soak, scrub and massage.",
+    "Facials are tailored to your skin type by a licensed esthetician.",
+    "Bridal makeup packages include a trial session two weeks before the wedding.",
+    "Cancellations must be made at least 24 hours in advance to avoid a fee.",
+    "We accept cash, credit cards and mobile payments.",
+    "Free parking is available behind the building.",
+    "Hair spa treatments restore moisture to dry and damaged hair.",
+    "Party makeup appointments should be booked at least three days ahead.",
+]
+SAMPLE_QUERIES = [
+    "When are you open?",
+    "How much is a haircut?",
+    "Do you do bridal makeup trials?",
+    "What is your cancellation policy?",
+    "Is there parking?",
+    "What does a pedicure include?",
+]
+
+
+def normalize(x: np.ndarray) -> np.ndarray:
+    return x / np.linalg.norm(x, axis=1, keepdims=True).clip(min=1e-12)
+
+
+def top_k(queries: np.ndarray, passages: np.ndarray, k: int) -> np.ndarray:
+    scores = normalize(queries) @ normalize(passages).T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def measure(backend, passages: List[str], queries: List[str], repeats: int):
+    backend.encode(passages[:2])  # warm-up
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        passage_emb = backend.encode(passages)
+    batch_elapsed = time.perf_counter() - start
+
+    latencies = []
+    for _ in range(repeats):
+        for query in queries:
+            t = time.perf_counter()
+            backend.encode([query])
+            latencies.append(time.perf_counter() - t)
+    query_emb = backend.encode(queries)
+
+    return {
+        "passages": passage_emb,
+        "queries": query_emb,
+        "sentences_per_sec": len(passages) * repeats / batch_elapsed,
+        "query_p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "query_p95_ms": float(np.percentile(latencies, 95) * 1000),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding backend parity and throughput")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--docs", type=Path, help="text file, one passage per non-empty line")
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    passages = SAMPLE_PASSAGES
+    if args.docs:
+        passages = [line.strip() for line in args.docs.read_text(encoding="utf-8").splitlines() if line.strip()]
+    queries = SAMPLE_QUERIES
+
+    reference = measure(SentenceTransformerBackend(threads=args.threads), passages, queries, args.repeats)
+    ref_top = top_k(reference["queries"], reference["passages"], args.k)
+
+    print(f"passages: {len(passages)}  queries: {len(queries)}  threads: {args.threads or 'default'}")
+    print(f"{'backend':<24}{'sent/s':>10}{'q p50 ms':>10}{'q p95 ms':>10}"
+          f"{'cos mean':>10}{'cos min':>10}{'overlap@' + str(args.k):>12}")
+
+    for name in args.backends:
+        try:
+            if name == SentenceTransformerBackend.name:
+                result = reference
+            else:
+                backend = create_embedding_backend(name, threads=args.threads)
+                result = measure(backend, passages, queries, args.repeats)
+        except Exception as e:
+            print(f"{name:<24} unavailable: {e}")
+            continue
+
+        cosines = np.sum(normalize(reference["passages"]) * normalize(result["passages"]), axis=1)
+        cand_top = top_k(result["queries"], result["passages"], args.k)
+        overlap = np.mean([
+            len(set(ref_row) & set(cand_row)) / args.k
+            for ref_row, cand_row in zip(ref_top, cand_top)
+        ])
+        print(f"{name:<24}{result['sentences_per_sec']:>10.1f}{result['query_p50_ms']:>10.2f}"
+              f"{result['query_p95_ms']:>10.2f}{cosines.mean():>10.4f}{cosines.min():>10.4f}"
+              f"{overlap:>12.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Throughput of query embedding with and without micro-batching.
+
+N concurrent callers each encode --queries single questions, either
+directly (one forward pass per call, all competing for cores) or through
+utils.embeddings.MicroBatcher. Reports queries/sec, p50/p95 latency and
+the batcher's batch-size / queue-depth metrics.
+
+--simulate replaces the model with a stand-in that holds one lock per
+forward pass (a single core) and costs a fixed overhead plus a per-item
+time, so the effect of batching can be measured without model weights.
+
+Run from the repo root:
+    python -m benchmarks.bench_microbatch --callers 1 10 100
+    python -m benchmarks.bench_microbatch --simulate --overhead-ms 5 --per-item-ms 0.2
+"""
+
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.embeddings import MicroBatcher, create_embedding_backend
+
+QUESTIONS = [
+    "When are you open on Sundays?",
+    "How much does a haircut cost?",
+    "Do you offer bridal makeup trials?",
+    "What is your cancellation policy?",
+    "Is parking available?",
+    "How long does a facial take?",
+]
+
+
+class SimulatedBackend:
+    """Single-core stand-in: one pass at a time, overhead + per-item cost"""
+
+    def __init__(self, overhead_ms: float, per_item_ms: float, dim: int = 384):
+        self.overhead_s = overhead_ms / 1000
+        self.per_item_s = per_item_ms / 1000
+        self.dim = dim
+        self._core = threading.Lock()
+
+    def encode(self, texts):
+        with self._core:
+            time.sleep(self.overhead_s + self.per_item_s * len(texts))
+        return np.zeros((len(texts), self.dim), dtype="float32")
+
+
+def run(encode, callers: int, per_caller: int):
+    def caller(idx):
+        latencies = []
+        for i in range(per_caller):
+            text = f"{QUESTIONS[(idx + i) % len(QUESTIONS)]} ({idx}-{i})"
+            start = time.perf_counter()
+            encode(text)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        latencies = [lat for result in pool.map(caller, range(callers)) for lat in result]
+    wall = time.perf_counter() - start
+    return len(latencies) / wall, np.percentile(latencies, 50) * 1000, np.percentile(latencies, 95) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query embedding micro-batching benchmark")
+    parser.add_argument("--callers", nargs="+", type=int, default=[1, 10, 100])
+    parser.add_argument("--queries", type=int, default=20, help="queries per caller")
+    parser.add_argument("--backend", default=None, help="EMBEDDING_BACKEND override")
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--wait-ms", type=float, default=2.0)
+    parser.add_argument("--simulate", action="store_true", help="use SimulatedBackend instead of a model")
+    parser.add_argument("--overhead-ms", type=float, default=5.0, help="simulated cost per forward pass")
+    parser.add_argument("--per-item-ms", type=float, default=0.2, help="simulated cost per query in a pass")
+    args = parser.parse_args()
+
+    if args.simulate:
+        backend = SimulatedBackend(args.overhead_ms, args.per_item_ms)
+    elif args.backend:
+        backend = create_embedding_backend(args.backend)
+    else:
+        backend = create_embedding_backend()
+    backend.encode(["warm-up"])
+
+    print(f"{'callers':>8}{'mode':>10}{'q/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'mean batch':>12}{'max queue':>11}")
+    for callers in args.callers:
+        qps, p50, p95 = run(lambda text: backend.encode([text])[0], callers, args.queries)
+        print(f"{callers:>8}{'direct':>10}{qps:>10.1f}{p50:>10.2f}{p95:>10.2f}{'1.0':>12}{'-':>11}")
+
+        batcher = MicroBatcher(backend, max_batch_size=args.max_batch, max_wait_ms=args.wait_ms)
+        qps_b, p50, p95 = run(batcher.encode_one, callers, args.queries)
+        metrics = batcher.metrics()
+        print(f"{callers:>8}{'batched':>10}{qps_b:>10.1f}{p50:>10.2f}{p95:>10.2f}"
+              f"{metrics['mean_batch_size']:>12.1f}{metrics['max_queue_depth']:>11}")
+        print(f"{'':>8}{'speedup':>10}{qps_b / qps:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark for utils.search: FTS5 search latency on a synthetic bookings
+database vs. the old approach (load every row, pandas str.contains).
+
+Run from the repo root:
+    python -m benchmarks.bench_search --bookings 300000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+FIRST = ["alice", "bob", "carol", "dan", "erin", "frank", "grace", "heidi", "ivan", "judy",
+         "mallory", "niaj", "olivia", "peggy", "rupert", "sybil", "trent", "victor", "walter", "zoe"]
+LAST = ["smith", "jones", "brown", "taylor", "wilson", "davies", "evans", "thomas", "roberts",
+        "johnson", "walker", "wright", "robinson", "thompson", "white", "hughes", "edwards"]
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[max(0, -(-len(ordered) * p // 100) - 1)]
+
+
+def populate(db_path: str, n_bookings: int, seed: int = 0):
+    """Raw inserts after init_db, so the search triggers do the indexing"""
+    rng = random.Random(seed)
+    n_customers = max(1, n_bookings // 3)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO customers (customer_id, name, email, phone) VALUES (?, ?, ?, ?)",
+        (
+            (i, f"{rng.choice(FIRST).title()} {rng.choice(LAST).title()}",
+             f"user{i}@example.com", f"{rng.randint(10**9, 10**10 - 1)}")
+            for i in range(1, n_customers + 1)
+        )
+    )
+    services = ["Haircut", "Hair Coloring", "Manicure", "Pedicure", "Facial", "Massage"]
+    conn.executemany(
+        "INSERT INTO bookings (customer_id, booking_type, date, time, status, notes) "
+        "VALUES (?, ?, ?, ?, 'confirmed', ?)",
+        (
+            (rng.randint(1, n_customers), rng.choice(services),
+             f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", "10:00",
+             rng.choice(["", "", "allergic to latex", "prefers quiet room", "bring own polish"]))
+            for _ in range(n_bookings)
+        )
+    )
+    conn.commit()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bookings", type=int, default=300_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    # The synthetic database runs to hundreds of MB: removed when the run ends
+    with tempfile.TemporaryDirectory(prefix="bench_search_") as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+        try:
+            run(args, db_path)
+        finally:
+            from models.database import get_database
+            get_database().dispose()
+
+
+def run(args: argparse.Namespace, db_path: str):
+    import pandas as pd
+    from models import init_db
+    from utils.search import search_bookings
+
+    init_db()
+    start = time.perf_counter()
+    populate(db_path, args.bookings)
+    print(f"bookings: {args.bookings:,}  (inserted + indexed in {time.perf_counter() - start:.1f}s)")
+
+    rng = random.Random(1)
+    queries = [
+        rng.choice([
+            lambda: rng.choice(FIRST)[:3],
+            lambda: f"{rng.choice(FIRST)} {rng.choice(LAST)[:4]}",
+            lambda: f"user{rng.randint(1, args.bookings // 3)}",
+            lambda: "latex",
+        ])()
+        for _ in range(args.queries)
+    ]
+
+    fts_ms = []
+    for q in queries:
+        start = time.perf_counter()
+        search_bookings(q, limit=100)
+        fts_ms.append((time.perf_counter() - start) * 1000)
+
+    # Old dashboard path: load everything, then str.contains per filter
+    conn = sqlite3.connect(db_path)
+    start = time.perf_counter()
+    df = pd.read_sql(
+        "SELECT b.id, c.name, c.email, c.phone FROM bookings b JOIN customers c USING (customer_id)", conn
+    )
+    conn.close()
+    load_ms = (time.perf_counter() - start) * 1000
+    scan_ms = []
+    for q in queries[:20]:
+        start = time.perf_counter()
+        df[df['name'].str.contains(q, case=False, na=False) | df['email'].str.contains(q, case=False, na=False)]
+        scan_ms.append((time.perf_counter() - start) * 1000)
+
+    print(f"fts5 search:      p50 {percentile(fts_ms, 50):7.2f} ms   p95 {percentile(fts_ms, 95):7.2f} ms")
+    print(f"str.contains:     p50 {percentile(scan_ms, 50):7.2f} ms   p95 {percentile(scan_ms, 95):7.2f} ms"
+          f"   (+ {load_ms:.0f} ms to load the table)")
+
+
+if __name__ == "__main__":
+    main()
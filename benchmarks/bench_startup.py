@@ -0,0 +1,101 @@
+"""
+Cold-start profile for the Streamlit entry point.
+
+Imports the modules app/main.py loads eagerly in a fresh interpreter with
+`-X importtime`, reports the slowest modules, checks that the heavy
+subsystems (torch, FAISS, langchain, pandas) stay off the chat page's
+import path, and compares the total against the time-to-first-render
+target. Optionally times the background warm-up.
+
+Run from the repo root:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --warmup
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+ROOT = Path(__file__).parent.parent
+
+# Mirrors the top-level imports of app/main.py
+ENTRY_IMPORTS = ["streamlit", "groq", "models", "app.service", "config", "utils.tracing"]
+
+# Must only load on first use
+HEAVY_MODULES = ["torch", "sentence_transformers", "faiss", "langchain_community",
+                 "langchain_text_splitters", "pandas"]
+
+
+def profile_imports(modules):
+    """Return ({module: cumulative_us}, loaded_heavy_modules) for a fresh interpreter"""
+    code = (
+        "import sys\n"
+        + "".join(f"import {m}\n" for m in modules)
+        + f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=str(ROOT), capture_output=True, text=True,
+        env={**os.environ, "WARMUP_ON_START": "0"},
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cum_us, name = line[len("import time:"):].split("|")
+        # Keep the indentation: it encodes nesting depth
+        cumulative[name[1:].rstrip()] = int(cum_us)
+    heavy = [m for m in proc.stdout.strip().split(",") if m]
+    return cumulative, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start profile")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--warmup", action="store_true", help="also time RAGPipeline.warm_up()")
+    args = parser.parse_args()
+
+    from config import TIME_TO_FIRST_RENDER_TARGET_MS
+
+    start = time.perf_counter()
+    cumulative, heavy = profile_imports(ENTRY_IMPORTS)
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    # Top-level entries (no indentation) are what the entry point pays for
+    top_level = {name: us for name, us in cumulative.items() if not name.startswith(" ")}
+    print(f"{'module':<40}{'cumulative ms':>15}")
+    for name, us in sorted(top_level.items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+        print(f"{name:<40}{us / 1000:>15.1f}")
+
+    import_ms = sum(top_level.values()) / 1000
+    print(f"\nentry imports: {import_ms:.0f} ms (interpreter wall {wall_ms:.0f} ms)")
+    print(f"target time-to-first-render: {TIME_TO_FIRST_RENDER_TARGET_MS} ms")
+
+    failed = False
+    if heavy:
+        print(f"FAIL: heavy modules imported eagerly: {', '.join(heavy)}")
+        failed = True
+    if import_ms > TIME_TO_FIRST_RENDER_TARGET_MS:
+        print("FAIL: entry imports alone exceed the time-to-first-render target")
+        failed = True
+
+    if args.warmup:
+        from utils.rag_pipeline import RAGPipeline
+        rag = RAGPipeline()
+        start = time.perf_counter()
+        rag.warm_up()
+        print(f"warm-up (model + index + dummy query): {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
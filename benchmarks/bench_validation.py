@@ -0,0 +1,62 @@
+"""
+Microbenchmark for utils.validation: per-record cost of the row API
+vs. the columnar batch API.
+
+Run from the repo root:
+    python -m benchmarks.bench_validation --rows 100000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pandas as pd
+
+from utils.validation import validate_batch, validate_record
+
+
+def make_records(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    records = []
+    for i in range(n):
+        records.append({
+            'name': f"Customer {i}",
+            'email': f"user{i}@example.com" if rng.random() > 0.05 else f"user{i}-at-example",
+            'phone': f"{rng.randint(100, 999)}-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+            'booking_type': "Haircut",
+            'date': f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            'time': f"{rng.randint(8, 25):02d}:{rng.choice(['00', '30'])}",
+        })
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    records = make_records(args.rows)
+    # Imports arrive as a DataFrame (e.g. pd.read_csv), so build it up front
+    frame = pd.DataFrame.from_records(records).astype("string")
+
+    start = time.perf_counter()
+    row_codes = [int(validate_record(r).code) for r in records]
+    row_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_codes = validate_batch(frame)
+    batch_elapsed = time.perf_counter() - start
+
+    assert row_codes == batch_codes.tolist(), "row and batch modes disagree"
+
+    print(f"rows: {args.rows}")
+    print(f"row mode:   {row_elapsed * 1e6 / args.rows:8.2f} us/record  ({row_elapsed:.3f}s total)")
+    print(f"batch mode: {batch_elapsed * 1e6 / args.rows:8.2f} us/record  ({batch_elapsed:.3f}s total)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Offline retrieval evaluation with chunking / top-k / index sweeps.
+
+Ingests a set of documents with every combination of CHUNK_SIZE,
+CHUNK_OVERLAP, dedup and FAISS index type, then answers a golden question
+set at each top_k and reports, in one table:
+recall@k, MRR, chunks indexed, index size, ingest time and p95 query latency.
+
+A retrieved chunk counts as relevant when it contains the golden passage,
+or at least --match-threshold of the passage's words (passages can be cut
+by chunk boundaries).
+
+Golden file (JSONL):
+    {"question": "How much is a haircut?", "passage": "A classic haircut ... costs $35"}
+
+Run from the repo root:
+    python -m benchmarks.eval_retrieval --docs uploads/*.pdf --golden golden.jsonl \\
+        --chunk-sizes 500 1000 1500 --overlaps 0 200 --top-k 1 3 5 --index Flat HNSW32
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.chunking import chunk_pages, deduplicate
+from utils.embeddings import create_embedding_backend
+from utils.rag_pipeline import RAGPipeline
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def load_pages(paths: List[Path]) -> List[Tuple[str, int, str]]:
+    pages = []
+    for path in paths:
+        if path.suffix.lower() == ".pdf":
+            from langchain_community.document_loaders import PyPDFLoader
+            for i, page in enumerate(PyPDFLoader(str(path)).load()):
+                pages.append((path.name, page.metadata.get("page", i) + 1, page.page_content))
+        else:
+            pages.append((path.name, 1, path.read_text(encoding="utf-8")))
+    return pages
+
+
+def load_golden(path: Path) -> List[Dict[str, str]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def words(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def is_relevant(chunk: str, passage: str, threshold: float) -> bool:
+    chunk_norm = " ".join(words(chunk))
+    passage_words = words(passage)
+    if " ".join(passage_words) in chunk_norm:
+        return True
+    if not passage_words:
+        return False
+    chunk_words = set(chunk_norm.split())
+    return sum(w in chunk_words for w in passage_words) / len(passage_words) >= threshold
+
+
+def evaluate(rag: RAGPipeline, golden: List[Dict[str, str]], k: int, threshold: float) -> Dict[str, float]:
+    shard = rag.shard()
+    hits, reciprocal_ranks, latencies = 0, [], []
+    for item in golden:
+        start = time.perf_counter()
+        query = np.array([rag._embed_query(item["question"]).astype("float32")])
+        results = shard.search(query, k)
+        latencies.append(time.perf_counter() - start)
+
+        rank = next(
+            (pos for pos, (_, text, _) in enumerate(results, 1)
+             if is_relevant(text, item["passage"], threshold)),
+            None
+        )
+        hits += rank is not None
+        reciprocal_ranks.append(1 / rank if rank else 0.0)
+
+    return {
+        "recall": hits / len(golden),
+        "mrr": float(np.mean(reciprocal_ranks)),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrieval quality/latency sweep")
+    parser.add_argument("--docs", nargs="+", type=Path, required=True, help="PDF or text files")
+    parser.add_argument("--golden", type=Path, required=True, help="question/passage JSONL")
+    parser.add_argument("--chunk-sizes", nargs="+", type=int, default=[500, 1000, 1500])
+    parser.add_argument("--overlaps", nargs="+", type=int, default=[0, 200])
+    parser.add_argument("--top-k", nargs="+", type=int, default=[1, 3, 5])
+    parser.add_argument("--index", nargs="+", default=["Flat"], help="faiss.index_factory strings")
+    parser.add_argument("--dedup", nargs="+", choices=["on", "off"], default=["on"])
+    parser.add_argument("--match-threshold", type=float, default=0.8)
+    parser.add_argument("--csv", type=Path, help="also write the table as CSV")
+    args = parser.parse_args()
+
+    import faiss
+
+    pages = load_pages(args.docs)
+    golden = load_golden(args.golden)
+    # Load the model once; every configuration shares it
+    backend = create_embedding_backend()
+
+    rows = []
+    grid = itertools.product(args.chunk_sizes, args.overlaps, args.dedup, args.index)
+    for chunk_size, overlap, dedup, index_factory in grid:
+        if overlap >= chunk_size:
+            continue
+
+        start = time.perf_counter()
+        chunks = chunk_pages(pages, chunk_size=chunk_size, chunk_overlap=overlap)
+        if dedup == "on":
+            chunks, _ = deduplicate(chunks)
+        # Scratch store: never read from or publish to the production index
+        with tempfile.TemporaryDirectory(prefix="eval_retrieval_") as store_dir:
+            rag = RAGPipeline(embedding_backend=backend, store_dir=Path(store_dir))
+            try:
+                rag._build_vector_store(
+                    [c.text for c in chunks], [c.metadata() for c in chunks], index_factory=index_factory
+                )
+            except RuntimeError as e:
+                print(f"skipping {index_factory} at chunk_size={chunk_size}: {e}")
+                continue
+            ingest_s = time.perf_counter() - start
+            index_bytes = len(faiss.serialize_index(rag.shard().index))
+
+            for k in args.top_k:
+                stats = evaluate(rag, golden, k, args.match_threshold)
+                rows.append({
+                    "chunk_size": chunk_size,
+                    "overlap": overlap,
+                    "dedup": dedup,
+                    "index": index_factory,
+                    "top_k": k,
+                    "recall@k": round(stats["recall"], 3),
+                    "mrr": round(stats["mrr"], 3),
+                    "chunks": len(chunks),
+                    "index_kb": round(index_bytes / 1024, 1),
+                    "ingest_s": round(ingest_s, 2),
+                    "p95_ms": round(stats["p95_ms"], 2),
+                })
+
+    if not rows:
+        print("no configurations evaluated")
+        return
+
+    columns = list(rows[0])
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) + 2 for c in columns}
+    print("".join(c.rjust(widths[c]) for c in columns))
+    for row in rows:
+        print("".join(str(row[c]).rjust(widths[c]) for c in columns))
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"written to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
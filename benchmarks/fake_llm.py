@@ -0,0 +1,43 @@
+"""
+Deterministic stand-in for the Groq client used by ChatLogic.
+
+Implements just enough of client.chat.completions.create() for headless
+benchmarks: the reply and the simulated latency are derived from a hash
+of the prompt, so runs are reproducible without network access.
+"""
+
+import hashlib
+import time
+from types import SimpleNamespace
+from typing import Dict, List
+
+
+class _Completions:
+    def __init__(self, latency_ms: float, jitter_ms: float):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.calls = 0
+
+    def create(self, model: str, messages: List[Dict], **kwargs):
+        self.calls += 1
+        prompt = messages[-1]["content"] if messages else ""
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+
+        # Deterministic jitter in [0, jitter_ms)
+        jitter = (digest[0] / 256) * self.jitter_ms
+        if self.latency_ms or jitter:
+            time.sleep((self.latency_ms + jitter) / 1000)
+
+        content = f"[fake-llm:{digest[:4].hex()}] Thanks for your message about: {prompt[:60]}"
+        message = SimpleNamespace(role="assistant", content=content)
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")]
+        )
+
+
+class FakeGroq:
+    """Drop-in replacement for groq.Groq in ChatLogic(client=...)"""
+
+    def __init__(self, latency_ms: float = 250.0, jitter_ms: float = 100.0):
+        self.chat = SimpleNamespace(completions=_Completions(latency_ms, jitter_ms))
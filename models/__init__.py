@@ -1,8 +1,11 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import func, inspect, text, Column, Index, Integer, Float, String, Text, DateTime, ForeignKey
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.schema import CreateIndex
 from datetime import datetime
-from config import DATABASE_URL
+from config import SALON_SERVICES
+from models.database import get_database
+from utils.tracing import traced
 
 Base = declarative_base()
 
@@ -12,7 +15,7 @@ class Customer(Base):
     customer_id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(100), nullable=False)
     email = Column(String(100), nullable=False, unique=True)
-    phone = Column(String(15), nullable=False)
+    phone = Column(String(15), nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationship
@@ -21,16 +24,23 @@ class Customer(Base):
     def __repr__(self):
         return f"<Customer(name='{self.name}', email='{self.email}')>"
 
+# Returning-customer lookups and booking writes match emails case-insensitively
+Index('ix_customers_email_lower', func.lower(Customer.email))
+
 class Booking(Base):
     __tablename__ = 'bookings'
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    customer_id = Column(Integer, ForeignKey('customers.customer_id'), nullable=False)
+    customer_id = Column(Integer, ForeignKey('customers.customer_id'), nullable=False, index=True)
     booking_type = Column(String(100), nullable=False)
     date = Column(String(20), nullable=False)
     time = Column(String(10), nullable=False)
+    # date + time parsed once at write time, for indexed range queries
+    starts_at = Column(DateTime, index=True)
+    branch = Column(String(50))  # conversation namespace the booking came from
+    notes = Column(Text)
     status = Column(String(20), default='confirmed')
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)  # admin listing, newest first
     
     # Relationship
     customer = relationship("Customer", back_populates="bookings")
@@ -38,15 +48,89 @@ class Booking(Base):
     def __repr__(self):
         return f"<Booking(id={self.id}, type='{self.booking_type}', date='{self.date}')>"
 
+class Service(Base):
+    __tablename__ = 'services'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(100), nullable=False, unique=True)
+    aliases = Column(String(255), default='')  # comma-separated
+    duration_minutes = Column(Integer)
+    price = Column(Float)
+    location = Column(String(100))
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def alias_list(self):
+        return [a.strip() for a in (self.aliases or '').split(',') if a.strip()]
+
+    def __repr__(self):
+        return f"<Service(name='{self.name}')>"
+
 # Database initialization
 def init_db():
-    """Initialize database and create tables"""
-    engine = create_engine(DATABASE_URL)
+    """Initialize database and create tables (SQLite or Postgres)"""
+    engine = get_database().engine
     Base.metadata.create_all(engine)
+    # create_all skips existing tables; add columns and indexes introduced since
+    add_missing_columns(engine)
+    # IF NOT EXISTS rather than checkfirst: reflection can't see expression indexes
+    with engine.begin() as conn:
+        for table in (Customer.__table__, Booking.__table__):
+            for index in table.indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+    backfill_starts_at(engine)
+    seed_services(engine)
+    # Full-text search table + sync triggers (SQLite), backfilled on first run
+    from utils.search import create_search_index
+    create_search_index(engine)
     return engine
 
+ADDED_BOOKING_COLUMNS = ("starts_at", "branch", "notes")
+
+def add_missing_columns(engine):
+    """Add nullable columns that older databases lack"""
+    existing = {c["name"] for c in inspect(engine).get_columns(Booking.__tablename__)}
+    with engine.begin() as conn:
+        for name in ADDED_BOOKING_COLUMNS:
+            if name not in existing:
+                # Column type rendered for this backend (DATETIME vs TIMESTAMP)
+                ddl_type = Booking.__table__.c[name].type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE bookings ADD COLUMN {name} {ddl_type}"))
+
+def parse_starts_at(date: str, time: str):
+    """Booking date (YYYY-MM-DD) and time (HH:MM) as a datetime, or None"""
+    try:
+        return datetime.strptime(f"{date} {time}", "%Y-%m-%d %H:%M")
+    except (TypeError, ValueError):
+        return None
+
+def backfill_starts_at(engine):
+    """Fill starts_at for bookings written before the column existed"""
+    session = sessionmaker(bind=engine)()
+    try:
+        rows = session.query(Booking).filter(Booking.starts_at.is_(None)).all()
+        for booking in rows:
+            booking.starts_at = parse_starts_at(booking.date, booking.time)
+        if rows:
+            session.commit()
+    finally:
+        session.close()
+
+def seed_services(engine):
+    """Populate an empty services table from config.SALON_SERVICES"""
+    session = sessionmaker(bind=engine)()
+    try:
+        if session.query(Service).count() == 0:
+            for entry in SALON_SERVICES:
+                session.add(Service(name=entry["name"], aliases=",".join(entry.get("aliases", []))))
+            session.commit()
+    finally:
+        session.close()
+
+@traced("db.get_session")
 def get_session():
-    """Get database session"""
-    engine = create_engine(DATABASE_URL)
-    Session = sessionmaker(bind=engine)
-    return Session()
\ No newline at end of file
+    """Get database session (pooled connection; close() returns it)"""
+    return get_database().session()
+
+def async_session():
+    """AsyncSession on the same database, for use in `async with`"""
+    return get_database().async_session()
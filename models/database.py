@@ -0,0 +1,184 @@
+"""
+Database backends behind DATABASE_URL.
+
+One Database per URL and process holds a pooled sync engine (Streamlit
+app, API turns, tools, background jobs) and a lazily created async engine
+on the same database for asyncio code. Nothing in the request path uses it
+yet: API turns run in a thread pool on the sync engine, and only
+benchmarks.bench_db_writes exercises the async booking tool.
+
+- sqlite (default): WAL journal and a busy timeout, so concurrent writers
+  queue instead of failing with "database is locked"; async via aiosqlite
+- postgresql: connection pool sized by DB_POOL_SIZE + DB_MAX_OVERFLOW;
+  sync via the URL's driver (postgresql+psycopg2://, or SQLAlchemy's
+  default for postgresql://), async via asyncpg
+- sqlite:// (in memory, e.g. tests): a single shared connection, no pool
+  sizing
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from config import (
+    DATABASE_URL,
+    DB_MAX_OVERFLOW,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    SQLITE_BUSY_TIMEOUT,
+)
+
+# backend -> async driver
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+# driver module -> package to install
+DRIVER_PACKAGES = {
+    "aiosqlite": "aiosqlite",
+    "asyncpg": "asyncpg",
+    "psycopg": "psycopg[binary]",
+    "psycopg2": "psycopg2-binary",
+}
+
+
+def _sqlite_on_connect(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints; safe with WAL
+    cursor.execute(f"PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT * 1000)}")
+    cursor.close()
+
+
+class Database:
+    """Pooled sync and async engines for one database URL"""
+
+    def __init__(
+        self,
+        url: str = DATABASE_URL,
+        pool_size: int = DB_POOL_SIZE,
+        max_overflow: int = DB_MAX_OVERFLOW,
+        pool_timeout: float = DB_POOL_TIMEOUT,
+        pool_recycle: int = DB_POOL_RECYCLE
+    ):
+        self.url = make_url(url)
+        self.backend = self.url.get_backend_name()
+        if self.backend not in ASYNC_DRIVERS:
+            raise ValueError(
+                f"Unsupported DATABASE_URL backend '{self.backend}'. Use one of: {', '.join(ASYNC_DRIVERS)}"
+            )
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.pool_recycle = pool_recycle
+
+        self._lock = threading.Lock()
+        self._engine: Optional[Engine] = None
+        self._sessionmaker: Optional[sessionmaker] = None
+        self._async_engine = None
+        self._async_sessionmaker = None
+
+    def engine_options(self, url: Optional[URL] = None) -> Dict[str, Any]:
+        url = url or self.url
+        options: Dict[str, Any] = {}
+        # Sizing arguments only exist on QueuePool (and its asyncio variant)
+        if issubclass(url.get_dialect().get_pool_class(url), QueuePool):
+            options.update(pool_size=self.pool_size, max_overflow=self.max_overflow, pool_timeout=self.pool_timeout)
+        elif self.backend == "sqlite":
+            # In-memory database: one connection shared by every thread, so all see the same tables
+            options["poolclass"] = StaticPool
+
+        if self.backend == "sqlite":
+            # Sessions are handed between threads (executor, reminder thread)
+            options["connect_args"] = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT}
+        else:
+            # Drop connections the server or a proxy closed while idle
+            options["pool_recycle"] = self.pool_recycle
+            options["pool_pre_ping"] = True
+        return options
+
+    # -----------------------------
+    # Sync
+    # -----------------------------
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    engine = self._create(create_engine, self.url)
+                    if self.backend == "sqlite":
+                        event.listen(engine, "connect", _sqlite_on_connect)
+                    self._sessionmaker = sessionmaker(bind=engine)
+                    self._engine = engine
+        return self._engine
+
+    def session(self) -> Session:
+        self.engine
+        return self._sessionmaker()
+
+    # -----------------------------
+    # Async
+    # -----------------------------
+    @property
+    def async_engine(self):
+        if self._async_engine is None:
+            with self._lock:
+                if self._async_engine is None:
+                    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+                    url = self.url.set(drivername=ASYNC_DRIVERS[self.backend])
+                    engine = self._create(create_async_engine, url)
+                    if self.backend == "sqlite":
+                        event.listen(engine.sync_engine, "connect", _sqlite_on_connect)
+                    self._async_sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+                    self._async_engine = engine
+        return self._async_engine
+
+    def async_session(self):
+        self.async_engine
+        return self._async_sessionmaker()
+
+    # -----------------------------
+    # Lifecycle
+    # -----------------------------
+    def _create(self, factory, url):
+        try:
+            return factory(url, **self.engine_options(url))
+        except ImportError as e:
+            module = getattr(e, "name", None) or url.drivername
+            package = DRIVER_PACKAGES.get(module, module)
+            raise ImportError(f"DATABASE_URL driver '{url.drivername}' requires the '{package}' package") from e
+
+    def pool_status(self) -> Dict[str, Any]:
+        status = {"backend": self.backend}
+        if self._engine is not None:
+            status["sync"] = self._engine.pool.status()
+        if self._async_engine is not None:
+            status["async"] = self._async_engine.pool.status()
+        return status
+
+    def dispose(self):
+        if self._engine is not None:
+            self._engine.dispose()
+
+    async def dispose_async(self):
+        """Close async connections; the next async_session() starts a new engine
+        (an async engine is tied to the event loop it first ran on)"""
+        with self._lock:
+            engine, self._async_engine = self._async_engine, None
+        if engine is not None:
+            await engine.dispose()
+
+
+_databases: Dict[str, Database] = {}
+_databases_lock = threading.Lock()
+
+
+def get_database(url: str = DATABASE_URL) -> Database:
+    """The process-wide Database for url"""
+    with _databases_lock:
+        if url not in _databases:
+            _databases[url] = Database(url)
+        return _databases[url]
@@ -0,0 +1,23 @@
+import sys
+
+from utils.memory import deep_sizeof
+
+
+def test_deep_sizeof_counts_every_nested_object():
+    # Distinct, non-interned keys and values, so each is counted exactly once
+    data = {f"key-{i}": [10_000 + i * 100 + j for j in range(20)] for i in range(200)}
+
+    expected = sys.getsizeof(data, 0)
+    for key, values in data.items():
+        expected += sys.getsizeof(key, 0) + sys.getsizeof(values, 0)
+        expected += sum(sys.getsizeof(v, 0) for v in values)
+
+    assert deep_sizeof(data) == expected
+
+
+def test_deep_sizeof_counts_shared_objects_once():
+    shared = [f"item-{i}" for i in range(50)]
+    data = {"a": shared, "b": shared}
+
+    expected = sys.getsizeof(data, 0) + sys.getsizeof("a", 0) + sys.getsizeof("b", 0) + deep_sizeof(shared)
+    assert deep_sizeof(data) == expected
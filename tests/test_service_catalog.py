@@ -0,0 +1,28 @@
+from sqlalchemy import text
+
+import models
+from models import Base, Service
+from models.database import Database
+from utils.service_catalog import ServiceCatalog
+
+
+def test_catalog_picks_up_raw_sql_updates(tmp_path, monkeypatch):
+    database = Database(f"sqlite:///{tmp_path / 'catalog.db'}")
+    Base.metadata.create_all(database.engine)
+    with database.session() as session:
+        session.add_all([Service(name="Pedicure", aliases=""), Service(name="Facial", aliases="")])
+        session.commit()
+    monkeypatch.setattr(models, "get_session", database.session)
+
+    catalog = ServiceCatalog(refresh_interval=0)
+    assert catalog.match("book me a pedicure") == "Pedicure"
+    assert catalog.match("something for my toes") is None
+
+    # Same row count, and updated_at is not touched outside the ORM
+    with database.engine.begin() as conn:
+        conn.execute(text("UPDATE services SET aliases = 'toes' WHERE name = 'Pedicure'"))
+
+    assert catalog.maybe_refresh()
+    assert catalog.match("something for my toes") == "Pedicure"
+    assert not catalog.maybe_refresh()
+    database.dispose()
@@ -0,0 +1,37 @@
+import math
+
+import pandas as pd
+import pytest
+
+from utils.validation import ValidationCode, validate_batch, validate_record
+
+VALID_BOOKING = {
+    "name": "Asha Rao",
+    "email": "asha@example.com",
+    "phone": "98765 43210",
+    "booking_type": "Haircut",
+    "date": "2031-05-04",
+    "time": "14:30",
+}
+
+CASES = [
+    ({}, ValidationCode.OK),
+    ({"email": "asha@example.com\n"}, ValidationCode.INVALID_EMAIL),
+    ({"phone": "9876543210\n"}, ValidationCode.INVALID_PHONE),
+    ({"date": "2031-05-04\n"}, ValidationCode.INVALID_DATE),
+    ({"time": "14:30\n"}, ValidationCode.INVALID_TIME),
+    ({"name": ""}, ValidationCode.MISSING_FIELD),
+    ({"name": None}, ValidationCode.MISSING_FIELD),
+    ({"name": math.nan}, ValidationCode.MISSING_FIELD),
+    ({"name": pd.NA}, ValidationCode.MISSING_FIELD),
+    ({"phone": 0}, ValidationCode.INVALID_PHONE),
+]
+
+
+@pytest.mark.parametrize("changes, expected", CASES)
+def test_record_and_batch_agree(changes, expected):
+    booking = {**VALID_BOOKING, **changes}
+    assert validate_record(booking).code == expected
+
+    batch = validate_batch({field: [value] for field, value in booking.items()})
+    assert batch[0] == expected
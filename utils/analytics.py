@@ -0,0 +1,236 @@
+"""
+Booking analytics for capacity planning.
+
+Bookings are pulled once in columnar form (starts_at, service, branch,
+status) and every metric is computed with NumPy / pandas vectorized ops:
+- occupancy(): weekday x hour heatmaps, overall or per service / branch
+- daily_demand(), rolling_demand(): daily booking counts and trends
+- forecast_demand(): weekday-seasonal forecast for the coming days
+
+BookingAnalytics caches reports per day and per version of the table.
+"""
+
+import threading
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    ANALYTICS_CAPACITY_PER_HOUR,
+    BUSINESS_HOURS,
+    DEFAULT_NAMESPACE,
+    FORECAST_HORIZON_DAYS,
+    FORECAST_WINDOW_WEEKS,
+)
+
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+GROUP_BY = ('service', 'branch')
+
+
+def business_hours() -> List[int]:
+    start = int(BUSINESS_HOURS['start'].split(':')[0])
+    end = int(BUSINESS_HOURS['end'].split(':')[0])
+    return list(range(start, end))
+
+
+# -----------------------------
+# Loading
+# -----------------------------
+def load_bookings(statuses: Tuple[str, ...] = ('confirmed',)) -> pd.DataFrame:
+    """Bookings as columns: starts_at, service, branch, status"""
+    from models import Booking, get_session
+
+    session = get_session()
+    try:
+        query = session.query(
+            Booking.starts_at,
+            Booking.booking_type.label('service'),
+            Booking.branch,
+            Booking.status
+        ).filter(Booking.starts_at.isnot(None))
+        if statuses:
+            query = query.filter(Booking.status.in_(statuses))
+        frame = pd.read_sql(query.statement, session.bind, parse_dates=['starts_at'])
+    finally:
+        session.close()
+
+    frame['branch'] = frame['branch'].fillna(DEFAULT_NAMESPACE)
+    return frame
+
+
+def _time_codes(starts_at: pd.Series) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Days since epoch, weekday (Mon=0) and hour for every booking"""
+    hours = starts_at.to_numpy(dtype='datetime64[h]').astype(np.int64)
+    days = hours // 24
+    weekday = (days + 3) % 7  # 1970-01-01 was a Thursday
+    return days, weekday, hours % 24
+
+
+def _group_codes(frame: pd.DataFrame, by: Optional[str]) -> Tuple[np.ndarray, List[str]]:
+    if by is None:
+        return np.zeros(len(frame), dtype=np.int64), ['All']
+    if by not in GROUP_BY:
+        raise ValueError(f"Unknown grouping: {by}")
+    codes, labels = pd.factorize(frame[by], sort=True)
+    return codes, list(labels)
+
+
+# -----------------------------
+# Occupancy
+# -----------------------------
+def occupancy(
+    frame: pd.DataFrame,
+    by: Optional[str] = None,
+    capacity: int = ANALYTICS_CAPACITY_PER_HOUR,
+    hours: Optional[List[int]] = None
+) -> Dict[str, pd.DataFrame]:
+    """
+    Share of hourly capacity used, averaged over every occurrence of each
+    weekday in the data's date range.
+    Returns {group: weekday x hour DataFrame}; a single 'All' entry when by is None
+    """
+    if frame.empty:
+        return {}
+    hours = hours or business_hours()
+
+    days, weekday, hour = _time_codes(frame['starts_at'])
+    codes, labels = _group_codes(frame, by)
+    n_groups = len(labels)
+
+    slots = (codes * 7 + weekday) * 24 + hour
+    counts = np.bincount(slots, minlength=n_groups * 7 * 24).reshape(n_groups, 7, 24)
+
+    all_days = np.arange(days.min(), days.max() + 1)
+    weekday_occurrences = np.bincount((all_days + 3) % 7, minlength=7)
+    rates = counts / (np.maximum(weekday_occurrences, 1)[None, :, None] * capacity)
+    rates = rates[:, :, hours]
+
+    columns = [f"{h:02d}:00" for h in hours]
+    return {
+        label: pd.DataFrame(rates[i], index=WEEKDAYS, columns=columns)
+        for i, label in enumerate(labels)
+    }
+
+
+# -----------------------------
+# Demand
+# -----------------------------
+def daily_demand(frame: pd.DataFrame, by: Optional[str] = None, until: Optional[date] = None) -> pd.DataFrame:
+    """
+    Bookings per calendar day (no gaps) up to and including until (default
+    today), one column per group. Appointments already booked for later
+    days are not history and are left out.
+    """
+    if frame.empty:
+        return pd.DataFrame()
+
+    days, _, _ = _time_codes(frame['starts_at'])
+    last_day = np.datetime64(until or date.today(), 'D').astype(np.int64)
+    past = days <= last_day
+    if not past.all():
+        frame, days = frame[past], days[past]
+        if frame.empty:
+            return pd.DataFrame()
+
+    codes, labels = _group_codes(frame, by)
+    first_day = days.min()
+    n_days = int(last_day - first_day + 1)
+
+    counts = np.bincount(
+        codes * n_days + (days - first_day),
+        minlength=len(labels) * n_days
+    ).reshape(len(labels), n_days).T
+
+    index = pd.date_range(np.datetime64(int(first_day), 'D'), periods=n_days, freq='D')
+    return pd.DataFrame(counts, index=index, columns=labels)
+
+
+def rolling_demand(daily: pd.DataFrame, window_days: int = 7) -> pd.DataFrame:
+    return daily.rolling(window_days, min_periods=1).mean()
+
+
+def forecast_demand(
+    daily: pd.DataFrame,
+    horizon_days: int = FORECAST_HORIZON_DAYS,
+    window_weeks: int = FORECAST_WINDOW_WEEKS
+) -> pd.DataFrame:
+    """
+    Weekday-seasonal forecast: each future day gets the mean of the same
+    weekday over the last window_weeks full weeks of history. Starts the
+    day after daily ends (tomorrow, for daily_demand's default cut-off).
+    """
+    if daily.empty:
+        return pd.DataFrame()
+
+    values = daily.to_numpy(dtype=float)
+    n_weeks = min(window_weeks, len(values) // 7)
+    future = pd.date_range(daily.index[-1] + pd.Timedelta(days=1), periods=horizon_days, freq='D')
+
+    if n_weeks == 0:
+        # Less than a week of history: flat mean
+        forecast = np.repeat(values.mean(axis=0, keepdims=True), horizon_days, axis=0)
+        return pd.DataFrame(forecast, index=future, columns=daily.columns)
+
+    recent = values[-7 * n_weeks:].reshape(n_weeks, 7, -1)
+    profile = recent.mean(axis=0)  # position k = k days after recent_start, mod 7
+    recent_start = daily.index[-7 * n_weeks]
+    positions = ((future - recent_start).days % 7).to_numpy()
+    return pd.DataFrame(profile[positions], index=future, columns=daily.columns)
+
+
+# -----------------------------
+# Cached reports
+# -----------------------------
+class BookingAnalytics:
+    """
+    Per-process cache of analytics reports. Reports are rebuilt when the
+    day changes or confirmed bookings change (their count and max id).
+    """
+
+    def __init__(self, loader: Callable[[], pd.DataFrame] = load_bookings):
+        self.loader = loader
+        self._lock = threading.Lock()
+        self._key = None
+        self._frame: Optional[pd.DataFrame] = None
+        self._reports: Dict[Optional[str], Dict[str, Any]] = {}
+
+    def report(self, by: Optional[str] = None) -> Dict[str, Any]:
+        """occupancy, daily, rolling and forecast results for one grouping"""
+        key = (date.today(), self._data_version())
+        with self._lock:
+            if key != self._key:
+                self._key = key
+                self._frame = None
+                self._reports = {}
+
+            if by not in self._reports:
+                if self._frame is None:
+                    self._frame = self.loader()
+                daily = daily_demand(self._frame, by, until=key[0])
+                self._reports[by] = {
+                    'occupancy': occupancy(self._frame, by),
+                    'daily': daily,
+                    'rolling': rolling_demand(daily),
+                    'forecast': forecast_demand(daily),
+                }
+            return self._reports[by]
+
+    def _data_version(self):
+        from sqlalchemy import func
+        from models import Booking, get_session
+
+        session = get_session()
+        try:
+            return tuple(
+                session.query(func.count(Booking.id), func.max(Booking.id))
+                .filter(Booking.status == 'confirmed')
+                .one()
+            )
+        finally:
+            session.close()
+
+
+# Shared by every dashboard session in this process
+booking_analytics = BookingAnalytics()
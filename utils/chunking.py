@@ -0,0 +1,115 @@
+"""
+Page-aware chunking with near-duplicate elimination.
+
+Each PDF page is split on its own, so chunks never straddle documents or
+pages, and every chunk carries its source file and page number. Repeated
+headers, footers and price tables are then removed with MinHash + LSH
+before anything is embedded.
+"""
+
+import re
+import zlib
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from config import (
+    CHUNK_OVERLAP,
+    CHUNK_SIZE,
+    DEDUP_THRESHOLD,
+    MINHASH_BANDS,
+    MINHASH_PERMUTATIONS,
+)
+
+_WORD_RE = re.compile(r"\w+")
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+
+
+@dataclass
+class Chunk:
+    text: str
+    source: str
+    page: int
+    chunk_index: int
+
+    def metadata(self) -> Dict:
+        meta = asdict(self)
+        del meta["text"]
+        return meta
+
+
+def chunk_pages(pages: Iterable[Tuple[str, int, str]],
+                chunk_size: int = CHUNK_SIZE,
+                chunk_overlap: int = CHUNK_OVERLAP) -> List[Chunk]:
+    """Split (source, page, text) tuples page by page"""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    chunks = []
+    for source, page, text in pages:
+        for i, piece in enumerate(splitter.split_text(text)):
+            chunks.append(Chunk(text=piece, source=source, page=page, chunk_index=i))
+    return chunks
+
+
+# -----------------------------
+# MinHash / LSH
+# -----------------------------
+class MinHasher:
+    """MinHash signatures over word 3-gram shingles"""
+
+    def __init__(self, num_perm: int = MINHASH_PERMUTATIONS, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        # a*x + b stays below 2**64 for 32-bit shingle hashes and 31-bit a, b
+        self.a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 1 << 31, size=num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+
+    @staticmethod
+    def shingles(text: str, n: int = 3) -> np.ndarray:
+        words = _WORD_RE.findall(text.lower())
+        if len(words) < n:
+            grams = [" ".join(words)]
+        else:
+            grams = {" ".join(words[i:i + n]) for i in range(len(words) - n + 1)}
+        return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        x = self.shingles(text)
+        hashes = (self.a[:, None] * x[None, :] + self.b[:, None]) % _MERSENNE_PRIME
+        return hashes.min(axis=1)
+
+
+def deduplicate(chunks: List[Chunk],
+                threshold: float = DEDUP_THRESHOLD,
+                num_perm: int = MINHASH_PERMUTATIONS,
+                bands: int = MINHASH_BANDS) -> Tuple[List[Chunk], int]:
+    """
+    Drop chunks whose estimated Jaccard similarity to an earlier kept chunk
+    is >= threshold. Returns (kept_chunks, removed_count).
+    """
+    if num_perm % bands:
+        raise ValueError("MINHASH_PERMUTATIONS must be divisible by MINHASH_BANDS")
+
+    rows = num_perm // bands
+    hasher = MinHasher(num_perm)
+    buckets: Dict[Tuple[int, bytes], List[int]] = {}
+    kept: List[Chunk] = []
+    signatures: List[np.ndarray] = []
+
+    for chunk in chunks:
+        sig = hasher.signature(chunk.text)
+        keys = [(band, sig[band * rows:(band + 1) * rows].tobytes()) for band in range(bands)]
+
+        candidates = {idx for key in keys for idx in buckets.get(key, ())}
+        if any(np.mean(signatures[idx] == sig) >= threshold for idx in candidates):
+            continue
+
+        idx = len(kept)
+        kept.append(chunk)
+        signatures.append(sig)
+        for key in keys:
+            buckets.setdefault(key, []).append(idx)
+
+    return kept, len(chunks) - len(kept)
@@ -0,0 +1,115 @@
+"""
+Returning-customer profile cache.
+
+Bounded LRU over the customers table, keyed by lowercased email. A
+profile is only returned when the caller also knows the phone number on
+that record, so BookingFlow never reveals a stored customer to someone
+who merely typed or guessed one identifier. Misses are cached too (a new
+customer's email is looked up on every turn until they book), and entries
+expire after a TTL so writes made by other processes show up.
+BookingTools invalidates on write.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from config import CUSTOMER_CACHE_SIZE, CUSTOMER_CACHE_TTL_SECONDS
+
+_NON_DIGITS = re.compile(r"\D")
+_MISS = None
+
+
+def _email_key(email: str) -> str:
+    return "e:" + email.strip().lower()
+
+
+def _digits(phone: str) -> str:
+    return _NON_DIGITS.sub("", phone or "")
+
+
+class CustomerCache:
+    def __init__(self, max_entries: int = CUSTOMER_CACHE_SIZE, ttl_seconds: int = CUSTOMER_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Optional[Dict[str, str]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, email: str, phone: str) -> Optional[Dict[str, str]]:
+        """
+        Return {'name', 'email', 'phone', 'last_service'} when email belongs to
+        exactly one customer whose stored phone has the same digits as phone,
+        else None. last_service is the service of their latest booking, or None
+        """
+        if not email or not _digits(phone):
+            return None
+        key = _email_key(email)
+        found, profile = self._get(key)
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+            profile = self._load(key)
+            self._put(key, profile)
+        if profile is None or _digits(profile["phone"]) != _digits(phone):
+            return None
+        return profile
+
+    def invalidate(self, email: str):
+        with self._lock:
+            self._entries.pop(_email_key(email), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _get(self, key: str) -> Tuple[bool, Optional[Dict[str, str]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, _MISS
+            expires_at, profile = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return False, _MISS
+            self._entries.move_to_end(key)
+            return True, profile
+
+    def _put(self, key: str, profile: Optional[Dict[str, str]]):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, profile)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _load(self, key: str) -> Optional[Dict[str, str]]:
+        from sqlalchemy import func
+        from models import Booking, Customer, get_session
+
+        session = get_session()
+        try:
+            email = key.split(":", 1)[1]
+            # Emails are stored as typed; two rows differing only in case are ambiguous
+            matches = session.query(Customer).filter(func.lower(Customer.email) == email).limit(2).all()
+            if len(matches) != 1:
+                return None
+            customer = matches[0]
+            last_service = (
+                session.query(Booking.booking_type)
+                .filter(Booking.customer_id == customer.customer_id)
+                .order_by(Booking.created_at.desc(), Booking.id.desc())
+                .limit(1)
+                .scalar()
+            )
+            return {"name": customer.name, "email": customer.email, "phone": customer.phone,
+                    "last_service": last_service}
+        finally:
+            session.close()
+
+
+# Shared by every conversation in this process
+customer_cache = CustomerCache()
@@ -1,3 +1,6 @@
+from typing import Any, Dict, List
+
+
 class EmailService:
     """Mock email service for demo purposes"""
 
@@ -14,3 +17,15 @@ class EmailService:
             "success": True,
             "message": "📧 Email notification simulated (email service disabled for demo)."
         }
+
+    def send_booking_reminders(self, reminders: List[Dict[str, Any]]) -> dict:
+        """
+        Send a batch of appointment reminders
+        Input: dicts with to_email, customer_name, booking_id, booking_type,
+        starts_at and hours_before
+        """
+        return {
+            "success": True,
+            "sent": len(reminders),
+            "message": f"📧 {len(reminders)} reminder(s) simulated (email service disabled for demo)."
+        }
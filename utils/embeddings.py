@@ -0,0 +1,216 @@
+"""
+Pluggable CPU embedding backends for RAGPipeline.
+
+Selected with config.EMBEDDING_BACKEND:
+- "sentence-transformers": full-precision PyTorch (reference)
+- "onnx":                  ONNX Runtime via sentence-transformers' ONNX backend
+- "int8":                  PyTorch with dynamic int8 quantization of Linear layers
+
+All backends return float32 arrays of the same dimension, so an index built
+with one can be queried with another; benchmarks/bench_embeddings.py checks
+how closely they agree.
+"""
+
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any, Dict, List
+
+import numpy as np
+
+from config import (
+    EMBEDDING_BACKEND,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_MODEL,
+    EMBEDDING_ONNX_FILE,
+    EMBEDDING_THREADS,
+    QUERY_BATCH_MAX_SIZE,
+    QUERY_BATCH_WAIT_MS,
+)
+
+
+class EmbeddingBackend(ABC):
+    name = "base"
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL, threads: int = EMBEDDING_THREADS,
+                 batch_size: int = EMBEDDING_BATCH_SIZE):
+        self.model_name = model_name
+        self.threads = threads
+        self.batch_size = batch_size
+
+    @abstractmethod
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Return a (len(texts), dim) float32 array"""
+
+    def memory_bytes(self) -> int:
+        """Weights held in memory (0 if the model does not expose them)"""
+        model = getattr(self, "model", None)
+        parameters = getattr(model, "parameters", None)
+        if parameters is None:
+            return 0
+        return sum(p.numel() * p.element_size() for p in parameters())
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    name = "sentence-transformers"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        if self.threads:
+            torch.set_num_threads(self.threads)
+        self.model = self._load(SentenceTransformer)
+
+    def _load(self, model_cls):
+        return model_cls(self.model_name, device="cpu")
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(
+            texts, batch_size=self.batch_size, show_progress_bar=False, convert_to_numpy=True
+        ).astype("float32", copy=False)
+
+
+class Int8Backend(SentenceTransformerBackend):
+    """Dynamic int8 quantization: weights stored as int8, activations quantized per batch"""
+    name = "int8"
+
+    def _load(self, model_cls):
+        import torch
+        from torch.ao.quantization import quantize_dynamic
+
+        model = model_cls(self.model_name, device="cpu")
+        return quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class OnnxBackend(SentenceTransformerBackend):
+    """ONNX Runtime (requires sentence-transformers[onnx])"""
+    name = "onnx"
+
+    def _load(self, model_cls):
+        import onnxruntime as ort
+
+        session_options = ort.SessionOptions()
+        if self.threads:
+            session_options.intra_op_num_threads = self.threads
+            session_options.inter_op_num_threads = 1
+        return model_cls(
+            self.model_name,
+            device="cpu",
+            backend="onnx",
+            model_kwargs={
+                "file_name": EMBEDDING_ONNX_FILE,
+                "provider": "CPUExecutionProvider",
+                "session_options": session_options,
+            },
+        )
+
+
+BACKENDS = {
+    SentenceTransformerBackend.name: SentenceTransformerBackend,
+    OnnxBackend.name: OnnxBackend,
+    Int8Backend.name: Int8Backend,
+}
+
+
+def create_embedding_backend(name: str = EMBEDDING_BACKEND, **kwargs) -> EmbeddingBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND '{name}'. Use one of: {', '.join(BACKENDS)}")
+    return BACKENDS[name](**kwargs)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-query encodings into one forward pass.
+
+    Callers submit a text and get a Future. A single worker thread takes
+    the first queued request, collects more for up to max_wait_ms or until
+    max_batch_size, encodes them with one backend.encode() call and resolves
+    the futures. Under load, requests that queue up while a batch is running
+    go into the next batch, so one CPU-bound pass replaces many small
+    passes competing for cores.
+    """
+
+    def __init__(self, backend: EmbeddingBackend, max_batch_size: int = QUERY_BATCH_MAX_SIZE,
+                 max_wait_ms: float = QUERY_BATCH_WAIT_MS):
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._batch_sizes: Counter = Counter()
+        self._items = 0
+        self._max_queue_depth = 0
+
+    def submit(self, text: str) -> Future:
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((text, future))
+        depth = self._queue.qsize()
+        if depth > self._max_queue_depth:
+            self._max_queue_depth = depth
+        return future
+
+    def encode_one(self, text: str) -> np.ndarray:
+        return self.submit(text).result()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            batches = sum(self._batch_sizes.values())
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_queue_depth,
+                "batches": batches,
+                "items": self._items,
+                "mean_batch_size": self._items / batches if batches else 0.0,
+                "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+            }
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._start_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(
+                        target=self._run, name="embedding-microbatcher", daemon=True
+                    )
+                    self._worker.start()
+
+    def _collect(self) -> List[tuple]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    # Window closed: still take whatever is already waiting
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [text for text, _ in batch]
+            try:
+                embeddings = self.backend.encode(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
+            with self._stats_lock:
+                self._batch_sizes[len(batch)] += 1
+                self._items += len(batch)
+
@@ -0,0 +1,262 @@
+"""
+Opt-in memory instrumentation (MEMORY_PROFILING=1).
+
+A MemoryProfiler report records:
+- process RSS and tracemalloc totals
+- bytes held by each registered subsystem (RAG pipeline, caches, stores)
+- the largest sessions in the session store, stored and decoded, under a
+  truncated hash of their id (conversation ids grant access to transcripts)
+- the allocation sites that grew fastest since the previous report
+
+Reports are taken on demand (admin dashboard, GET /debug/memory) or every
+MEMORY_SAMPLE_INTERVAL seconds, kept in memory and appended to
+MEMORY_REPORT_FILE as JSONL.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import types
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from config import (
+    MEMORY_HISTORY,
+    MEMORY_REPORT_FILE,
+    MEMORY_SAMPLE_INTERVAL,
+    MEMORY_TRACE_FRAMES,
+)
+
+# Objects deep_sizeof never descends into: shared by everything, not owned
+_SKIP_TYPES = (
+    type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+    types.MethodType, type(threading.Lock()), threading.Thread, threading.Event,
+)
+_TRACEMALLOC_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def deep_sizeof(obj: Any, max_objects: int = 1_000_000) -> int:
+    """
+    Approximate bytes reachable from obj: containers, instance attributes,
+    NumPy arrays (nbytes) and torch tensors (storage). Objects are counted
+    once; classes, modules, functions, locks and threads are skipped.
+    """
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack and len(seen) < max_objects:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _SKIP_TYPES):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current, 0)
+
+        if hasattr(current, "element_size") and hasattr(current, "nelement"):
+            # torch tensor: getsizeof sees only the Python wrapper
+            total += current.element_size() * current.nelement()
+            continue
+        if isinstance(getattr(current, "nbytes", None), int):
+            # NumPy / pandas: getsizeof already includes owned buffers
+            continue
+
+        if isinstance(current, (str, bytes, bytearray, int, float, bool)) or current is None:
+            continue
+        try:
+            if isinstance(current, dict):
+                # Not items(): the temporary pairs are freed mid-walk and their
+                # ids reused, so later objects would be skipped as already seen
+                stack.extend(list(current.keys()))
+                stack.extend(list(current.values()))
+            elif isinstance(current, (list, tuple, set, frozenset, deque)):
+                stack.extend(list(current))
+        except RuntimeError:
+            pass  # mutated by another thread mid-walk
+        if hasattr(current, "__dict__"):
+            stack.append(current.__dict__)
+        for slot in getattr(type(current), "__slots__", ()):
+            if hasattr(current, slot):
+                stack.append(getattr(current, slot))
+    return total
+
+
+def rss_bytes() -> Optional[int]:
+    """Current resident set size (Linux), else peak RSS, else None"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return None
+
+
+def session_digest(session_id: str) -> str:
+    """Stable short label for a session that cannot be used to open it"""
+    return hashlib.sha256(session_id.encode("utf-8")).hexdigest()[:12]
+
+
+Sizer = Callable[[], Union[int, Dict[str, int]]]
+
+
+class MemoryProfiler:
+    def __init__(
+        self,
+        frames: int = MEMORY_TRACE_FRAMES,
+        interval: float = MEMORY_SAMPLE_INTERVAL,
+        report_file: Optional[Path] = MEMORY_REPORT_FILE,
+        history: int = MEMORY_HISTORY
+    ):
+        self.frames = frames
+        self.interval = interval
+        self.report_file = Path(report_file) if report_file else None
+        self.history: deque = deque(maxlen=history)
+
+        self._sizers: Dict[str, Sizer] = {}
+        self._session_store = None
+        self._previous = None  # (timestamp, tracemalloc snapshot)
+        self._started_tracing = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # -----------------------------
+    # Registration
+    # -----------------------------
+    def register(self, name: str, sizer: Sizer):
+        """sizer returns bytes, or {part: bytes} reported as name.part"""
+        self._sizers[name] = sizer
+
+    def register_object(self, name: str, obj: Any):
+        self.register(name, lambda: deep_sizeof(obj))
+
+    def watch_sessions(self, store):
+        self._session_store = store
+
+    # -----------------------------
+    # Lifecycle
+    # -----------------------------
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        with self._lock:
+            self._previous = (time.time(), self._take_snapshot())
+        if self.interval > 0 and self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="memory-profiler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        # Leave tracing on if someone else (e.g. python -X tracemalloc) started it
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_tracing = False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.report()
+            except Exception as e:
+                print(f"Memory report failed: {e}")
+
+    # -----------------------------
+    # Reports
+    # -----------------------------
+    def report(self, top: int = 10) -> Dict[str, Any]:
+        """Take a report now, append it to the history and the report file"""
+        with self._lock:
+            now = time.time()
+            current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (None, None)
+            report = {
+                "timestamp": now,
+                "rss_bytes": rss_bytes(),
+                "traced_bytes": current,
+                "traced_peak_bytes": peak,
+                "subsystems": self._subsystem_sizes(),
+                "sessions": self._largest_sessions(top),
+                "growth": self._growth(now, top),
+            }
+            self.history.append(report)
+            self._write(report)
+        return report
+
+    def _subsystem_sizes(self) -> Dict[str, int]:
+        sizes = {}
+        for name, sizer in self._sizers.items():
+            try:
+                result = sizer()
+            except Exception:
+                continue
+            if isinstance(result, dict):
+                sizes.update({f"{name}.{part}": size for part, size in result.items()})
+            else:
+                sizes[name] = result
+        return dict(sorted(sizes.items(), key=lambda item: item[1], reverse=True))
+
+    def _largest_sessions(self, top: int) -> List[Dict[str, Any]]:
+        if self._session_store is None:
+            return []
+        sessions = []
+        for session_id, stored_bytes in self._session_store.largest(top):
+            # peek: a report must not refresh the sessions it is looking at
+            data = self._session_store.peek(session_id)
+            if data is None:
+                continue
+            sessions.append({
+                "session": session_digest(session_id),
+                "stored_bytes": stored_bytes,
+                "loaded_bytes": deep_sizeof(data),
+                "messages": len(data.get("m", [])),
+            })
+        return sessions
+
+    def _growth(self, now: float, top: int) -> List[Dict[str, Any]]:
+        """Allocation sites with the largest growth since the previous report"""
+        if not tracemalloc.is_tracing():
+            return []
+        snapshot = self._take_snapshot()
+        previous, self._previous = self._previous, (now, snapshot)
+        if previous is None:
+            return []
+
+        elapsed = max(now - previous[0], 1e-6)
+        stats = snapshot.compare_to(previous[1], "lineno")
+        growing = [s for s in stats if s.size_diff > 0][:top]
+        return [
+            {
+                "site": f"{s.traceback[0].filename}:{s.traceback[0].lineno}",
+                "size_bytes": s.size,
+                "growth_bytes": s.size_diff,
+                "growth_bytes_per_s": round(s.size_diff / elapsed, 1),
+                "count_growth": s.count_diff,
+            }
+            for s in growing
+        ]
+
+    def _take_snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(_TRACEMALLOC_FILTERS)
+
+    def _write(self, report: Dict[str, Any]):
+        if self.report_file is None:
+            return
+        self.report_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.report_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(report) + "\n")
@@ -1,79 +1,449 @@
 # RAGPipeline v2 - OpenAI removed
 
+import contextvars
 import os
-from typing import List
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 import numpy as np
-import faiss
-from sentence_transformers import SentenceTransformer
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import PyPDFLoader
-from config import CHUNK_SIZE, CHUNK_OVERLAP, VECTOR_STORE_DIR
+from config import (
+    DEDUP_ENABLED,
+    DEFAULT_NAMESPACE,
+    INDEX_FACTORY,
+    QUERY_MICROBATCH,
+    SHARD_SEARCH_WORKERS,
+    SNAPSHOT_KEEP,
+    SNAPSHOT_RELOAD_INTERVAL,
+    VECTOR_STORE_DIR,
+)
+from utils.chunking import chunk_pages, deduplicate
+from utils.embeddings import EmbeddingBackend, MicroBatcher, create_embedding_backend
+from utils.tracing import span, traced
 import pickle
 
+# faiss, the embedding backend (torch / onnxruntime) and langchain are imported on first
+# use so that importing this module stays cheap for the first page render.
+
+NAMESPACE_RE = re.compile(r"[A-Za-z0-9_-]{1,64}")  # use fullmatch
+
+
+class Snapshot(NamedTuple):
+    """An immutable, published version of a shard"""
+    version: Optional[str]
+    index: Any
+    documents: List[str]
+    metadatas: List[Dict]
+
+
+EMPTY_SNAPSHOT = Snapshot(None, None, [], [])
+
+
+class IndexShard:
+    """
+    One FAISS index + its chunks for a namespace (a branch or a document
+    collection). Shards load independently, on first use.
+
+    On disk a shard is a set of immutable snapshot directories plus a
+    CURRENT file naming the live one:
+
+        <shard>/CURRENT
+        <shard>/versions/<version>/faiss.index, documents.pkl, metadata.pkl
+
+    Publishing writes a new version and swaps CURRENT with os.replace, so
+    readers never see a half-written index. Indexes are opened with FAISS
+    mmap flags, so worker processes share one page-cache copy, and a change
+    of CURRENT is picked up by maybe_reload() without a restart.
+    """
+
+    def __init__(self, name: str, directory: Path):
+        self.name = name
+        self.directory = directory
+        self.versions_dir = directory / "versions"
+        self.current_path = directory / "CURRENT"
+
+        self._snapshot = EMPTY_SNAPSHOT
+        self._lock = threading.Lock()
+        self._unpublished = False  # built in memory, not yet saved
+        self._failed_load_key = None  # on-disk state the last failed load saw
+        self._next_load_attempt = 0.0
+        self._current_mtime_ns = None
+        self._next_reload_check = 0.0
+
+    # Views on the live snapshot
+    @property
+    def index(self):
+        return self._snapshot.index
+
+    @property
+    def documents(self) -> List[str]:
+        return self._snapshot.documents
+
+    @property
+    def metadatas(self) -> List[Dict]:
+        return self._snapshot.metadatas
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._snapshot.version
+
+    def exists(self) -> bool:
+        return self.current_path.exists() or (self.directory / "faiss.index").exists()
+
+    def current_version(self) -> Optional[str]:
+        try:
+            return self.current_path.read_text(encoding="utf-8").strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _disk_state(self) -> Optional[Tuple[str, int]]:
+        """(layout, mtime) of what load() would read, or None if nothing is on disk"""
+        for layout, path in (("versioned", self.current_path), ("legacy", self.directory / "faiss.index")):
+            try:
+                return layout, os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                continue
+        return None
+
+    def ensure_loaded(self) -> bool:
+        """Load the on-disk index on first use; until one loads, look again at
+        most every SNAPSHOT_RELOAD_INTERVAL, and only if CURRENT has changed"""
+        if self.index is not None:
+            return True
+        now = time.monotonic()
+        if now < self._next_load_attempt:
+            return False
+        with self._lock:
+            if self.index is None and now >= self._next_load_attempt:
+                self._next_load_attempt = now + SNAPSHOT_RELOAD_INTERVAL
+                state = self._disk_state()
+                if state is not None and state != self._failed_load_key:
+                    if not self.load():
+                        self._failed_load_key = state
+        return self.index is not None
+
+    def maybe_reload(self) -> bool:
+        """Hot-reload if another process published a new version"""
+        if self._unpublished:
+            return False  # never replace an in-memory build from disk before it is saved
+        now = time.monotonic()
+        if now < self._next_reload_check:
+            return False
+        self._next_reload_check = now + SNAPSHOT_RELOAD_INTERVAL
+
+        try:
+            mtime_ns = os.stat(self.current_path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime_ns == self._current_mtime_ns:
+            return False
+        if self.current_version() == self.version:
+            self._current_mtime_ns = mtime_ns
+            return False
+
+        with self._lock:
+            return self.load()
+
+    def load(self) -> bool:
+        try:
+            import faiss
+
+            mtime_ns = os.stat(self.current_path).st_mtime_ns if self.current_path.exists() else None
+            version = self.current_version()
+            if version:
+                snapshot_dir = self.versions_dir / version
+                flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+            elif (self.directory / "faiss.index").exists():
+                # Layout from before versioned snapshots
+                snapshot_dir = self.directory
+                flags = 0
+            else:
+                return False
+
+            index = faiss.read_index(str(snapshot_dir / "faiss.index"), flags)
+            with open(snapshot_dir / "documents.pkl", "rb") as f:
+                documents = pickle.load(f)
+            # Stores written before page-aware chunking have no metadata
+            metadatas = [{} for _ in documents]
+            if (snapshot_dir / "metadata.pkl").exists():
+                with open(snapshot_dir / "metadata.pkl", "rb") as f:
+                    metadatas = pickle.load(f)
+
+            # Single reference swap: in-flight searches keep the old snapshot
+            self._snapshot = Snapshot(version, index, documents, metadatas)
+            self._unpublished = False
+            self._current_mtime_ns = mtime_ns
+            return True
+        except Exception as e:
+            print(f"Error loading vector store '{self.name}':", e)
+        return False
+
+    def build(self, embeddings: np.ndarray, chunks: List[str], metadatas: Optional[List[Dict]] = None,
+              index_factory: str = INDEX_FACTORY):
+        import faiss
+
+        dim = embeddings.shape[1]
+        index = faiss.index_factory(dim, index_factory)
+        if not index.is_trained:
+            index.train(embeddings)
+        index.add(embeddings)
+
+        self._snapshot = Snapshot(None, index, chunks, metadatas or [{} for _ in chunks])
+        self._unpublished = True
+
+    def save(self) -> str:
+        """Publish the in-memory index as a new immutable version"""
+        import faiss
+
+        version = f"{time.time_ns():x}-{os.getpid()}"
+        self.versions_dir.mkdir(parents=True, exist_ok=True)
+
+        # Write into a temp dir and rename it, so a version dir is always complete
+        staging = self.versions_dir / f".{version}.tmp"
+        staging.mkdir()
+        faiss.write_index(self.index, str(staging / "faiss.index"))
+        with open(staging / "documents.pkl", "wb") as f:
+            pickle.dump(self.documents, f)
+        with open(staging / "metadata.pkl", "wb") as f:
+            pickle.dump(self.metadatas, f)
+        os.rename(staging, self.versions_dir / version)
+
+        # Atomic pointer swap
+        pointer_tmp = self.directory / f".CURRENT.{os.getpid()}.tmp"
+        pointer_tmp.write_text(version, encoding="utf-8")
+        os.replace(pointer_tmp, self.current_path)
+
+        self._snapshot = self._snapshot._replace(version=version)
+        self._unpublished = False
+        self._current_mtime_ns = os.stat(self.current_path).st_mtime_ns
+        self._prune_versions(keep=version)
+        return version
+
+    def _prune_versions(self, keep: str):
+        """Delete all but the newest SNAPSHOT_KEEP versions"""
+        versions = sorted(
+            (p for p in self.versions_dir.iterdir() if p.is_dir() and not p.name.startswith(".")),
+            key=lambda p: p.stat().st_mtime_ns,
+            reverse=True,
+        )
+        # Readers that still mmap a removed file keep their mapping (POSIX)
+        for old in versions[SNAPSHOT_KEEP:]:
+            if old.name != keep:
+                shutil.rmtree(old, ignore_errors=True)
+
+    def search(self, query_embedding: np.ndarray, top_k: int) -> List[Tuple[float, str, Dict]]:
+        if not self.ensure_loaded():
+            return []
+        self.maybe_reload()
+
+        snapshot = self._snapshot
+        with span("rag.vector_search", shard=self.name, top_k=top_k, ntotal=snapshot.index.ntotal):
+            distances, indices = snapshot.index.search(query_embedding, top_k)
+
+        # FAISS pads with -1 when the index holds fewer than top_k vectors
+        return [
+            (float(d), snapshot.documents[i], {**snapshot.metadatas[i], "namespace": self.name})
+            for d, i in zip(distances[0], indices[0]) if i >= 0
+        ]
+
+    def clear(self):
+        self._snapshot = EMPTY_SNAPSHOT
+        self._unpublished = False
+        if self.current_path.exists():
+            os.remove(self.current_path)
+        shutil.rmtree(self.versions_dir, ignore_errors=True)
+        for name in ("faiss.index", "documents.pkl", "metadata.pkl"):
+            path = self.directory / name
+            if path.exists():
+                os.remove(path)
+
 
 class RAGPipeline:
     """
     RAG Pipeline using local embeddings + FAISS
     (NO OpenAI, NO paid APIs)
+
+    Documents live in per-namespace shards. The default namespace lives in
+    store_dir itself (an older unversioned faiss.index there still loads);
+    others live under store_dir/shards/<namespace>/. store_dir defaults to
+    VECTOR_STORE_DIR; evaluation runs pass a scratch directory.
     """
 
-    def __init__(self):
-        # Free local embedding model
-        self.embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+    def __init__(self, embedding_backend: Optional[EmbeddingBackend] = None,
+                 store_dir: Path = VECTOR_STORE_DIR):
+        # Free local embedding model, loaded lazily (see embedding_model);
+        # the backend is chosen by config.EMBEDDING_BACKEND
+        self._embedding_model = embedding_backend
+        self._model_lock = threading.Lock()
+        self._query_batcher: Optional[MicroBatcher] = None
+
+        self.shards: Dict[str, IndexShard] = {}
+        self._shards_lock = threading.Lock()
+        self._search_pool: Optional[ThreadPoolExecutor] = None
+        # Shards found on disk, rescanned at most every SNAPSHOT_RELOAD_INTERVAL
+        self._disk_namespaces: List[str] = []
+        self._disk_scan_at: Optional[float] = None
+        self.last_ingest_stats: Dict[str, int] = {}
+
+        self.store_dir = Path(store_dir)
+        self.shards_dir = self.store_dir / "shards"
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def embedding_model(self) -> EmbeddingBackend:
+        if self._embedding_model is None:
+            with self._model_lock:
+                if self._embedding_model is None:
+                    self._embedding_model = create_embedding_backend()
+        return self._embedding_model
+
+    @property
+    def query_batcher(self) -> MicroBatcher:
+        """Shared by every conversation using this pipeline"""
+        if self._query_batcher is None:
+            backend = self.embedding_model
+            with self._model_lock:
+                if self._query_batcher is None:
+                    self._query_batcher = MicroBatcher(backend)
+        return self._query_batcher
 
-        self.vector_store = None
-        self.documents: List[str] = []
+    def memory_usage(self) -> Dict[str, int]:
+        """Bytes held per part, without loading anything that is not loaded yet"""
+        from utils.memory import deep_sizeof
 
-        VECTOR_STORE_DIR.mkdir(parents=True, exist_ok=True)
-        self.index_path = VECTOR_STORE_DIR / "faiss.index"
-        self.docs_path = VECTOR_STORE_DIR / "documents.pkl"
+        with self._shards_lock:
+            shards = list(self.shards.values())
+        usage = {
+            "documents": sum(deep_sizeof((s.documents, s.metadatas)) for s in shards),
+            # Vectors of mmap-loaded snapshots live in the shared page cache
+            "index_vectors": sum(s.index.ntotal * s.index.d * 4 for s in shards if s.index is not None),
+        }
+        if self._embedding_model is not None:
+            usage["embedding_model"] = self._embedding_model.memory_bytes()
+        return usage
+
+    def query_batch_metrics(self) -> Dict:
+        """Micro-batcher stats, without loading the model if nothing ran yet"""
+        return self._query_batcher.metrics() if self._query_batcher else {}
+
+    # -----------------------------
+    # Shards
+    # -----------------------------
+    def shard(self, namespace: str = DEFAULT_NAMESPACE) -> IndexShard:
+        # Namespaces become directory names
+        if not NAMESPACE_RE.fullmatch(namespace):
+            raise ValueError(f"Invalid namespace '{namespace}'. Use letters, digits, '-' or '_'.")
+        with self._shards_lock:
+            if namespace not in self.shards:
+                directory = self.store_dir if namespace == DEFAULT_NAMESPACE else self.shards_dir / namespace
+                self.shards[namespace] = IndexShard(namespace, directory)
+            return self.shards[namespace]
+
+    def namespaces(self) -> List[str]:
+        """Namespaces that have an index, in memory or on disk"""
+        with self._shards_lock:
+            names = {name for name, shard in self.shards.items() if shard.index is not None}
+        names.update(self._namespaces_on_disk())
+        return sorted(names)
+
+    def _namespaces_on_disk(self) -> List[str]:
+        now = time.monotonic()
+        if self._disk_scan_at is None or now - self._disk_scan_at >= SNAPSHOT_RELOAD_INTERVAL:
+            names = [DEFAULT_NAMESPACE] if self.shard(DEFAULT_NAMESPACE).exists() else []
+            if self.shards_dir.exists():
+                # Versioned shards and the older bare faiss.index layout
+                names.extend(
+                    p.name for p in self.shards_dir.iterdir()
+                    if NAMESPACE_RE.fullmatch(p.name) and self.shard(p.name).exists()
+                )
+            self._disk_namespaces = names
+            self._disk_scan_at = now
+        return self._disk_namespaces
+
+    # Default-namespace views kept for existing callers
+    @property
+    def vector_store(self):
+        return self.shard().index
+
+    @property
+    def documents(self) -> List[str]:
+        return self.shard().documents
+
+    # -----------------------------
+    # Warm-up
+    # -----------------------------
+    def ensure_vector_store_loaded(self, namespace: str = DEFAULT_NAMESPACE) -> bool:
+        return self.shard(namespace).ensure_loaded()
+
+    def warm_up(self):
+        """Load the model and indexes and run a dummy query"""
+        for namespace in self.namespaces():
+            self.ensure_vector_store_loaded(namespace)
+        self._embed_query("warm-up")
+        self.rag_tool("warm-up")
 
     # -----------------------------
     # Embedding helpers
     # -----------------------------
     def _embed_texts(self, texts: List[str]) -> np.ndarray:
-        return self.embedding_model.encode(texts, show_progress_bar=False)
+        return self.embedding_model.encode(texts)
 
+    @traced("rag.embed_query")
     def _embed_query(self, query: str) -> np.ndarray:
+        if QUERY_MICROBATCH:
+            return self.query_batcher.encode_one(query)
         return self.embedding_model.encode([query])[0]
 
     # -----------------------------
     # Load existing vector store
     # -----------------------------
-    def load_existing_vector_store(self) -> bool:
-        try:
-            if self.index_path.exists() and self.docs_path.exists():
-                self.vector_store = faiss.read_index(str(self.index_path))
-                with open(self.docs_path, "rb") as f:
-                    self.documents = pickle.load(f)
-                return True
-        except Exception as e:
-            print("Error loading vector store:", e)
-        return False
+    def load_existing_vector_store(self, namespace: str = DEFAULT_NAMESPACE) -> bool:
+        return self.shard(namespace).load()
 
     # -----------------------------
     # PDF processing
     # -----------------------------
-    def process_pdfs(self, pdf_paths: List[str]) -> bool:
+    def process_pdfs(self, pdf_paths: List[str], namespace: str = DEFAULT_NAMESPACE) -> bool:
         try:
-            all_text = []
+            from langchain_community.document_loaders import PyPDFLoader
+
+            pages = []
 
             for pdf_path in pdf_paths:
                 loader = PyPDFLoader(pdf_path)
-                pages = loader.load()
-                all_text.extend([page.page_content for page in pages])
+                source = Path(pdf_path).name
+                for i, page in enumerate(loader.load()):
+                    page_no = page.metadata.get("page", i) + 1
+                    pages.append((source, page_no, page.page_content))
 
-            if not all_text:
+            if not pages:
                 return False
 
-            splitter = RecursiveCharacterTextSplitter(
-                chunk_size=CHUNK_SIZE,
-                chunk_overlap=CHUNK_OVERLAP
+            # Split per page so chunks never straddle documents or pages
+            chunks = chunk_pages(pages)
+            removed = 0
+            if DEDUP_ENABLED:
+                chunks, removed = deduplicate(chunks)
+
+            if not chunks:
+                return False
+
+            self._build_vector_store(
+                [c.text for c in chunks],
+                [c.metadata() for c in chunks],
+                namespace=namespace
             )
+            self._save_vector_store(namespace)
 
-            chunks = splitter.split_text("\n".join(all_text))
-            self._build_vector_store(chunks)
-            self._save_vector_store()
+            self.last_ingest_stats = {
+                "pages": len(pages),
+                "chunks": len(chunks) + removed,
+                "duplicates_removed": removed,
+                "indexed": len(chunks),
+            }
             return True
 
         except Exception as e:
@@ -83,45 +453,64 @@ class RAGPipeline:
     # -----------------------------
     # Vector store logic
     # -----------------------------
-    def _build_vector_store(self, chunks: List[str]):
+    def _build_vector_store(self, chunks: List[str], metadatas: Optional[List[Dict]] = None,
+                            namespace: str = DEFAULT_NAMESPACE, index_factory: str = INDEX_FACTORY):
         embeddings = self._embed_texts(chunks).astype("float32")
+        self.shard(namespace).build(embeddings, chunks, metadatas, index_factory=index_factory)
 
-        dim = embeddings.shape[1]
-        self.vector_store = faiss.IndexFlatL2(dim)
-        self.vector_store.add(embeddings)
-
-        self.documents = chunks
-
-    def _save_vector_store(self):
-        faiss.write_index(self.vector_store, str(self.index_path))
-        with open(self.docs_path, "wb") as f:
-            pickle.dump(self.documents, f)
+    def _save_vector_store(self, namespace: str = DEFAULT_NAMESPACE):
+        self.shard(namespace).save()
+        self._disk_scan_at = None
 
     # -----------------------------
     # Retrieval (RAG)
     # -----------------------------
-    def rag_tool(self, query: str, top_k: int = 3):
-        if not self.vector_store:
+    def rag_tool(self, query: str, top_k: int = 3, namespace: Optional[str] = None):
+        """
+        Search one namespace, or fan out across every shard in parallel and
+        merge the closest top_k when namespace is None.
+        """
+        namespaces = [namespace] if namespace else self.namespaces()
+        shards = [self.shard(name) for name in namespaces]
+        shards = [s for s in shards if s.ensure_loaded()]
+        if not shards:
             return {"success": False, "answer": None}
 
-        query_embedding = self._embed_query(query).astype("float32")
-        distances, indices = self.vector_store.search(
-            np.array([query_embedding]), top_k
-        )
+        query_embedding = np.array([self._embed_query(query).astype("float32")])
+
+        if len(shards) == 1:
+            hits = shards[0].search(query_embedding, top_k)
+        else:
+            pool = self._get_search_pool()
+            # One context copy per task, so shard spans nest under the caller's span
+            futures = [
+                pool.submit(contextvars.copy_context().run, shard.search, query_embedding, top_k)
+                for shard in shards
+            ]
+            per_shard = [future.result() for future in futures]
+            hits = sorted((hit for shard_hits in per_shard for hit in shard_hits), key=lambda h: h[0])
+            hits = hits[:top_k]
 
-        results = [self.documents[i] for i in indices[0]]
-        answer = "\n".join(results)
+        answer = "\n".join(text for _, text, _ in hits)
 
-        return {"success": True, "answer": answer}
+        return {
+            "success": True,
+            "answer": answer,
+            "sources": [meta for _, _, meta in hits],
+        }
+
+    def _get_search_pool(self) -> ThreadPoolExecutor:
+        if self._search_pool is None:
+            with self._shards_lock:
+                if self._search_pool is None:
+                    self._search_pool = ThreadPoolExecutor(
+                        max_workers=SHARD_SEARCH_WORKERS, thread_name_prefix="shard-search"
+                    )
+        return self._search_pool
 
     # -----------------------------
     # Clear store
     # -----------------------------
-    def clear_vector_store(self):
-        self.vector_store = None
-        self.documents = []
-
-        if self.index_path.exists():
-            os.remove(self.index_path)
-        if self.docs_path.exists():
-            os.remove(self.docs_path)
+    def clear_vector_store(self, namespace: str = DEFAULT_NAMESPACE):
+        self.shard(namespace).clear()
+        self._disk_scan_at = None
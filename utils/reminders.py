@@ -0,0 +1,277 @@
+"""
+Appointment reminder scheduler.
+
+Only bookings starting inside the look-ahead window are held in memory,
+as (due_at, booking_id, hours_before) entries in a min-heap. The window
+is extended each tick with an indexed range query on bookings.starts_at,
+and bookings written by other processes are picked up by primary key
+(id > last seen). BookingTools notifies the scheduler directly on create
+and cancel; cancelled entries are dropped lazily when they reach the top
+of the heap, and each batch is re-checked against the table before it is
+handed to EmailService.
+"""
+
+import heapq
+import threading
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from config import (
+    REMINDER_BATCH_SIZE,
+    REMINDER_CATCHUP_MINUTES,
+    REMINDER_LOOKAHEAD_HOURS,
+    REMINDER_OFFSETS_HOURS,
+    REMINDER_TICK_SECONDS,
+)
+from utils.email_service import EmailService
+from utils.tracing import span
+
+
+@dataclass
+class ReminderTarget:
+    booking_id: int
+    starts_at: datetime
+    to_email: str
+    customer_name: str
+    booking_type: str
+
+
+class ReminderScheduler:
+    def __init__(
+        self,
+        email_service: Optional[EmailService] = None,
+        offsets_hours: Sequence[float] = REMINDER_OFFSETS_HOURS,
+        lookahead_hours: float = REMINDER_LOOKAHEAD_HOURS,
+        batch_size: int = REMINDER_BATCH_SIZE,
+        tick_seconds: float = REMINDER_TICK_SECONDS,
+        catchup_minutes: int = REMINDER_CATCHUP_MINUTES,
+        lag_samples: int = 1024
+    ):
+        if lookahead_hours <= max(offsets_hours):
+            raise ValueError("lookahead_hours must exceed the largest reminder offset")
+        self.email_service = email_service or EmailService()
+        self.offsets = [timedelta(hours=h) for h in offsets_hours]
+        self.lookahead = timedelta(hours=lookahead_hours)
+        self.batch_size = batch_size
+        self.tick_seconds = tick_seconds
+        self.catchup = timedelta(minutes=catchup_minutes)
+
+        self._heap: List[Tuple[datetime, int, float]] = []
+        self._targets: Dict[int, ReminderTarget] = {}
+        self._pending: Dict[int, int] = {}  # booking_id -> reminders left in the heap
+        self._lock = threading.Lock()
+        self._loaded_until: Optional[datetime] = None
+        self._last_seen_id = 0
+
+        self._lags_ms = deque(maxlen=lag_samples)
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # -----------------------------
+    # Lifecycle
+    # -----------------------------
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="reminder-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.tick_seconds + 5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"Reminder scheduler tick failed: {e}")
+            self._stop.wait(self.tick_seconds)
+
+    # -----------------------------
+    # Incremental updates (called by BookingTools)
+    # -----------------------------
+    def on_booking_created(self, target: ReminderTarget, now: Optional[datetime] = None):
+        now = now or datetime.now()
+        with self._lock:
+            if self._loaded_until is None or target.starts_at > self._loaded_until:
+                return  # picked up when the window reaches it
+            self._schedule(target, now)
+
+    def on_booking_cancelled(self, booking_id: int):
+        with self._lock:
+            self._targets.pop(booking_id, None)
+            self._pending.pop(booking_id, None)
+
+    def _schedule(self, target: ReminderTarget, now: datetime):
+        if target.booking_id in self._targets:
+            return
+        count = 0
+        for offset in self.offsets:
+            due_at = target.starts_at - offset
+            if due_at >= now - self.catchup:
+                heapq.heappush(self._heap, (due_at, target.booking_id, offset.total_seconds() / 3600))
+                count += 1
+        if count:
+            self._targets[target.booking_id] = target
+            self._pending[target.booking_id] = count
+
+    # -----------------------------
+    # Tick
+    # -----------------------------
+    def tick(self, now: Optional[datetime] = None) -> int:
+        """Refresh the window and send every due reminder; returns the number sent"""
+        now = now or datetime.now()
+        with span("reminders.tick"):
+            self._extend_window(now)
+            sent = 0
+            while True:
+                batch = self._pop_due(now)
+                if not batch:
+                    return sent
+                count = self._send(batch)
+                if count is None:
+                    return sent  # email backend failing; retried next tick
+                sent += count
+
+    def _extend_window(self, now: datetime):
+        from models import Booking, Customer, get_session
+
+        horizon = now + self.lookahead
+        session = get_session()
+        try:
+            last_id = session.query(Booking.id).order_by(Booking.id.desc()).limit(1).scalar() or 0
+            query = session.query(Booking, Customer).join(Customer).filter(Booking.status == 'confirmed')
+            if self._loaded_until is None:
+                windows = [query.filter(Booking.starts_at > now, Booking.starts_at <= horizon)]
+            else:
+                windows = [
+                    query.filter(Booking.starts_at > self._loaded_until, Booking.starts_at <= horizon),
+                    # Bookings written by other processes since the last tick
+                    query.filter(Booking.id > self._last_seen_id, Booking.id <= last_id,
+                                 Booking.starts_at <= horizon),
+                ]
+
+            rows = [row for window in windows for row in window.all()]
+        finally:
+            session.close()
+
+        with self._lock:
+            for booking, customer in rows:
+                self._schedule(ReminderTarget(
+                    booking_id=booking.id,
+                    starts_at=booking.starts_at,
+                    to_email=customer.email,
+                    customer_name=customer.name,
+                    booking_type=booking.booking_type
+                ), now)
+            self._loaded_until = horizon
+            self._last_seen_id = max(self._last_seen_id, last_id)
+
+    def _pop_due(self, now: datetime) -> List[Tuple[datetime, ReminderTarget, float]]:
+        batch = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now and len(batch) < self.batch_size:
+                due_at, booking_id, hours_before = heapq.heappop(self._heap)
+                target = self._targets.get(booking_id)
+                if target is None:
+                    continue  # cancelled
+                self._pending[booking_id] -= 1
+                if self._pending[booking_id] == 0:
+                    del self._pending[booking_id]
+                    del self._targets[booking_id]
+                batch.append((due_at, target, hours_before))
+        return batch
+
+    def _send(self, batch: List[Tuple[datetime, ReminderTarget, float]]) -> Optional[int]:
+        """Number of reminders sent, or None if the batch was requeued"""
+        # Cancellations made by other processes since the booking was loaded
+        confirmed = self._confirmed_ids({target.booking_id for _, target, _ in batch})
+        live = [entry for entry in batch if entry[1].booking_id in confirmed]
+        self.dropped += len(batch) - len(live)
+        if not live:
+            return 0
+
+        reminders = [
+            {
+                "to_email": target.to_email,
+                "customer_name": target.customer_name,
+                "booking_id": target.booking_id,
+                "booking_type": target.booking_type,
+                "starts_at": target.starts_at.strftime("%Y-%m-%d %H:%M"),
+                "hours_before": hours_before,
+            }
+            for _, target, hours_before in live
+        ]
+        with span("reminders.send", batch_size=len(reminders)):
+            try:
+                result = self.email_service.send_booking_reminders(reminders)
+            except Exception as e:
+                result = {"success": False, "message": str(e)}
+
+        if not result.get("success"):
+            self.failed += len(live)
+            self._requeue(live)
+            return None
+
+        sent_at = datetime.now()
+        for due_at, _, _ in live:
+            self._lags_ms.append(max(0.0, (sent_at - due_at).total_seconds() * 1000))
+        self.sent += len(live)
+        return len(live)
+
+    def _requeue(self, entries: List[Tuple[datetime, ReminderTarget, float]]):
+        with self._lock:
+            for due_at, target, hours_before in entries:
+                heapq.heappush(self._heap, (due_at, target.booking_id, hours_before))
+                self._targets[target.booking_id] = target
+                self._pending[target.booking_id] = self._pending.get(target.booking_id, 0) + 1
+
+    def _confirmed_ids(self, booking_ids: Set[int]) -> Set[int]:
+        from models import Booking, get_session
+
+        session = get_session()
+        try:
+            rows = session.query(Booking.id).filter(
+                Booking.id.in_(booking_ids), Booking.status == 'confirmed'
+            ).all()
+            return {row[0] for row in rows}
+        finally:
+            session.close()
+
+    # -----------------------------
+    # Reporting
+    # -----------------------------
+    def metrics(self) -> Dict[str, Any]:
+        """Queue size, counters and due-to-send lag percentiles"""
+        import math
+
+        with self._lock:
+            pending = sum(self._pending.values())
+            next_due = self._heap[0][0].isoformat() if self._heap else None
+        lags = sorted(self._lags_ms)
+
+        def percentile(p: float) -> Optional[float]:
+            if not lags:
+                return None
+            return round(lags[max(0, math.ceil(p / 100 * len(lags)) - 1)], 1)
+
+        return {
+            "pending": pending,
+            "next_due": next_due,
+            "sent": self.sent,
+            "dropped_cancelled": self.dropped,
+            "failed_attempts": self.failed,
+            "lag_ms_p50": percentile(50),
+            "lag_ms_p95": percentile(95),
+            "lag_ms_max": round(lags[-1], 1) if lags else None,
+        }
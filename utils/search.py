@@ -0,0 +1,150 @@
+"""
+Full-text search over bookings for the admin dashboard.
+
+On SQLite, `booking_search` is an FTS5 table with one row per booking
+(rowid = bookings.id) holding the customer's name, email and phone and
+the booking's service and notes. Triggers on `bookings` and `customers`
+keep it in sync; create_search_index() adds it to existing databases and
+backfills it. Queries are prefix-aware ("ali smi" finds "Alice Smith")
+and ranked with bm25, name matches weighted highest.
+
+Other databases, or SQLite builds without FTS5, fall back to LIKE scans.
+"""
+
+import re
+from typing import Any, Dict, List
+
+from sqlalchemy import or_, text
+from sqlalchemy.exc import OperationalError
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# bm25 column weights: name, email, phone, service, notes
+RANK_WEIGHTS = (10.0, 5.0, 5.0, 1.0, 1.0)
+
+_ROW_SELECT = """
+    INSERT INTO booking_search (rowid, name, email, phone, service, notes)
+    SELECT {booking}.id, {customer}.name, {customer}.email, {customer}.phone,
+           {booking}.booking_type, COALESCE({booking}.notes, '')
+"""
+
+SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS booking_search USING fts5(
+        name, email, phone, service, notes,
+        prefix = '2 3 4'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS booking_search_insert AFTER INSERT ON bookings BEGIN
+        {_ROW_SELECT.format(booking="NEW", customer="c")}
+        FROM customers c WHERE c.customer_id = NEW.customer_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS booking_search_delete AFTER DELETE ON bookings BEGIN
+        DELETE FROM booking_search WHERE rowid = OLD.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS booking_search_update
+    AFTER UPDATE OF customer_id, booking_type, notes ON bookings BEGIN
+        DELETE FROM booking_search WHERE rowid = OLD.id;
+        {_ROW_SELECT.format(booking="NEW", customer="c")}
+        FROM customers c WHERE c.customer_id = NEW.customer_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS booking_search_customer_update
+    AFTER UPDATE OF name, email, phone ON customers BEGIN
+        DELETE FROM booking_search
+        WHERE rowid IN (SELECT id FROM bookings WHERE customer_id = NEW.customer_id);
+        {_ROW_SELECT.format(booking="b", customer="NEW")}
+        FROM bookings b WHERE b.customer_id = NEW.customer_id;
+    END
+    """,
+]
+
+BACKFILL_SQL = f"""
+    {_ROW_SELECT.format(booking="b", customer="c")}
+    FROM bookings b JOIN customers c ON c.customer_id = b.customer_id
+"""
+
+# Rank and limit inside the FTS table, then join only the top rows
+SEARCH_SQL = f"""
+    SELECT b.id, c.name, c.email, c.phone, b.booking_type, b.date, b.time,
+           b.status, b.created_at, b.notes
+    FROM (
+        SELECT rowid, bm25(booking_search, {", ".join(str(w) for w in RANK_WEIGHTS)}) AS score
+        FROM booking_search
+        WHERE booking_search MATCH :query
+        ORDER BY score
+        LIMIT :limit
+    ) hits
+    JOIN bookings b ON b.id = hits.rowid
+    JOIN customers c ON c.customer_id = b.customer_id
+    ORDER BY hits.score
+"""
+
+RESULT_COLUMNS = [
+    'booking_id', 'name', 'email', 'phone', 'booking_type', 'date', 'time',
+    'status', 'created_at', 'notes'
+]
+
+
+def create_search_index(engine) -> bool:
+    """Create the FTS5 table and triggers if missing, backfilling existing rows"""
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.begin() as conn:
+        exists = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'booking_search'"
+        )).first() is not None
+        try:
+            for statement in SEARCH_DDL:
+                conn.execute(text(statement))
+        except OperationalError:
+            return False  # SQLite built without FTS5
+        if not exists:
+            conn.execute(text(BACKFILL_SQL))
+    return True
+
+
+def to_fts_query(query: str) -> str:
+    """Every word as a quoted prefix term, all required"""
+    return " ".join(f'"{token}"*' for token in TOKEN_RE.findall(query.lower()))
+
+
+def search_bookings(query: str, limit: int = 100) -> List[Dict[str, Any]]:
+    """Bookings matching query, best match first"""
+    from models import Booking, Customer, get_session
+
+    fts_query = to_fts_query(query)
+    if not fts_query:
+        return []
+
+    session = get_session()
+    try:
+        if session.bind.dialect.name == "sqlite":
+            try:
+                rows = session.execute(text(SEARCH_SQL), {"query": fts_query, "limit": limit}).fetchall()
+                return [dict(zip(RESULT_COLUMNS, row)) for row in rows]
+            except OperationalError:
+                pass  # no FTS5 table: fall through to LIKE
+
+        conditions = []
+        for token in TOKEN_RE.findall(query):
+            pattern = f"%{token}%"
+            conditions.append(or_(
+                Customer.name.ilike(pattern),
+                Customer.email.ilike(pattern),
+                Customer.phone.ilike(pattern),
+                Booking.notes.ilike(pattern)
+            ))
+        rows = session.query(
+            Booking.id, Customer.name, Customer.email, Customer.phone, Booking.booking_type,
+            Booking.date, Booking.time, Booking.status, Booking.created_at, Booking.notes
+        ).join(Customer).filter(*conditions).order_by(Booking.created_at.desc()).limit(limit).all()
+        return [dict(zip(RESULT_COLUMNS, row)) for row in rows]
+    finally:
+        session.close()
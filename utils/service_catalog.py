@@ -0,0 +1,222 @@
+"""
+Service catalog backed by the `services` table.
+
+The table is read once into an in-memory ServiceIndex and rebuilt when its
+contents change (rows compared every SERVICE_CATALOG_REFRESH_INTERVAL
+seconds, so edits made with raw SQL are picked up too). Matching a message is an exact
+phrase lookup first, then a trigram-filtered edit-distance search so typos
+like "pedicur" or "hair colur" still resolve.
+"""
+
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from config import SALON_SERVICES, SERVICE_CATALOG_REFRESH_INTERVAL
+
+WORD_RE = re.compile(r"[a-z]+")
+FUZZY_CANDIDATES = 3       # best trigram candidates verified by edit distance
+FUZZY_CACHE_SIZE = 10000   # memoized fuzzy lookups per index
+
+
+class ServiceInfo(NamedTuple):
+    name: str
+    aliases: Tuple[str, ...] = ()
+    duration_minutes: Optional[int] = None
+    price: Optional[float] = None
+    location: Optional[str] = None
+
+
+def _trigrams(term: str) -> Set[str]:
+    padded = f" {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _max_distance(term: str) -> int:
+    """Typos tolerated for a term; short terms must match exactly"""
+    if len(term) < 5:
+        return 0
+    if len(term) < 9:
+        return 1
+    return 2
+
+
+def edit_distance(a: str, b: str, bound: int) -> int:
+    """
+    Edit distance counting a swap of adjacent letters as one edit
+    ("facail" -> "facial"); gives up (returns bound + 1) past bound
+    """
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    before_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i]
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, before_previous[j - 2] + 1)
+            current.append(value)
+        if min(current) > bound:
+            return bound + 1
+        before_previous, previous = previous, current
+    return previous[-1]
+
+
+class ServiceIndex:
+    """Immutable lookup structure over one version of the catalog"""
+
+    def __init__(self, services: List[ServiceInfo]):
+        self.services = services
+        self.by_name = {s.name: s for s in services}
+        self.terms: Dict[str, ServiceInfo] = {}
+        for service in services:
+            for term in (service.name,) + service.aliases:
+                self.terms.setdefault(" ".join(WORD_RE.findall(term.lower())), service)
+        self.terms.pop("", None)
+        self.max_words = max((t.count(" ") + 1 for t in self.terms), default=1)
+
+        self.fuzzy_terms = [t for t in self.terms if _max_distance(t) > 0]
+        self.trigram_index: Dict[str, List[int]] = {}
+        # An edit (swaps included) breaks at most 4 trigrams, so a term
+        # within its distance bound shares at least this many with the phrase
+        self.min_shared: List[int] = []
+        for term_id, term in enumerate(self.fuzzy_terms):
+            grams = _trigrams(term)
+            for gram in grams:
+                self.trigram_index.setdefault(gram, []).append(term_id)
+            self.min_shared.append(max(1, len(grams) - 4 * _max_distance(term)))
+        self.max_term_length = max((len(t) for t in self.fuzzy_terms), default=0)
+        self._fuzzy_cache: Dict[str, Optional[Tuple[int, str]]] = {}
+
+    def match(self, text: str) -> Optional[ServiceInfo]:
+        tokens = WORD_RE.findall(text.lower())
+        phrases = [
+            " ".join(tokens[i:i + n])
+            for n in range(min(self.max_words, len(tokens)), 0, -1)
+            for i in range(len(tokens) - n + 1)
+        ]
+
+        # Exact: the longest phrase naming a service wins ("bridal makeup" over "makeup")
+        best = None
+        for phrase in phrases:
+            if phrase in self.terms and (best is None or len(phrase) > len(best)):
+                best = phrase
+        if best is not None:
+            return self.terms[best]
+
+        # Fuzzy: fewest edits, then the longest term
+        best_key, best_term = None, None
+        for phrase in phrases:
+            hit = self._fuzzy(phrase)
+            if hit is None:
+                continue
+            distance, term = hit
+            key = (distance, -len(term))
+            if best_key is None or key < best_key:
+                best_key, best_term = key, term
+        return self.terms[best_term] if best_term is not None else None
+
+    def _fuzzy(self, phrase: str) -> Optional[Tuple[int, str]]:
+        if phrase in self._fuzzy_cache:
+            return self._fuzzy_cache[phrase]
+
+        hit = None
+        if 4 <= len(phrase) <= self.max_term_length + 2:
+            shared = Counter()
+            for gram in _trigrams(phrase):
+                shared.update(self.trigram_index.get(gram, ()))
+            for term_id, count in shared.most_common(FUZZY_CANDIDATES):
+                if count < self.min_shared[term_id]:
+                    continue
+                term = self.fuzzy_terms[term_id]
+                bound = _max_distance(term)
+                distance = edit_distance(phrase, term, bound)
+                if distance <= bound and (hit is None or distance < hit[0]):
+                    hit = (distance, term)
+
+        if len(self._fuzzy_cache) >= FUZZY_CACHE_SIZE:
+            self._fuzzy_cache.clear()
+        self._fuzzy_cache[phrase] = hit
+        return hit
+
+
+class ServiceCatalog:
+    """Services table loaded into a ServiceIndex and kept fresh"""
+
+    def __init__(self, refresh_interval: float = SERVICE_CATALOG_REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self._index: Optional[ServiceIndex] = None
+        self._next_refresh_check = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def index(self) -> ServiceIndex:
+        self.maybe_refresh()
+        return self._index
+
+    def services(self) -> List[ServiceInfo]:
+        return self.index.services
+
+    def names(self) -> List[str]:
+        return [s.name for s in self.index.services]
+
+    def get(self, name: str) -> Optional[ServiceInfo]:
+        return self.index.by_name.get(name)
+
+    def match(self, text: str) -> Optional[str]:
+        """Name of the service mentioned in text, tolerating typos"""
+        service = self.index.match(text)
+        return service.name if service else None
+
+    def maybe_refresh(self) -> bool:
+        """Rebuild the index if the services table changed"""
+        now = time.monotonic()
+        if self._index is not None and now < self._next_refresh_check:
+            return False
+
+        with self._lock:
+            if self._index is not None and now < self._next_refresh_check:
+                return False
+            self._next_refresh_check = now + self.refresh_interval
+            return self._refresh()
+
+    def refresh(self) -> bool:
+        with self._lock:
+            self._next_refresh_check = time.monotonic() + self.refresh_interval
+            return self._refresh(force=True)
+
+    def _refresh(self, force: bool = False) -> bool:
+        from sqlalchemy.exc import SQLAlchemyError
+        from models import Service, get_session
+
+        # The table is a few dozen rows: compare contents rather than trusting
+        # updated_at, which UPDATEs issued outside the ORM leave untouched
+        session = get_session()
+        try:
+            rows = session.query(Service).order_by(Service.id).all()
+            services = [
+                ServiceInfo(r.name, tuple(r.alias_list()), r.duration_minutes, r.price, r.location)
+                for r in rows
+            ]
+        except SQLAlchemyError:
+            # Database not initialised yet: serve the seed catalog
+            if self._index is not None:
+                return False
+            services = []
+        finally:
+            session.close()
+
+        if not services:
+            services = [ServiceInfo(s["name"], tuple(s.get("aliases", ()))) for s in SALON_SERVICES]
+        if self._index is not None and not force and services == self._index.services:
+            return False
+        self._index = ServiceIndex(services)
+        return True
+
+
+# Shared by every conversation in this process
+service_catalog = ServiceCatalog()
@@ -0,0 +1,261 @@
+"""
+Pluggable conversation state stores.
+
+State is stored as zlib-compressed compact JSON, so any worker process
+can load any conversation and memory per session stays small. Every
+store applies a TTL; stale sessions are evicted lazily on read and in
+periodic sweeps (Redis expires keys natively).
+
+Backends (config.SESSION_STORE):
+- "memory": in-process LRU, bounded by SESSION_MAX_ENTRIES
+- "sqlite": shared file, works across worker processes on one host
+- "redis":  any Redis-compatible server at REDIS_URL
+"""
+
+import heapq
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import (
+    REDIS_URL,
+    SESSION_DB_PATH,
+    SESSION_MAX_ENTRIES,
+    SESSION_STORE,
+    SESSION_TTL_SECONDS,
+)
+
+
+def dumps(data: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+
+
+def loads(blob: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+class SessionStore(ABC):
+    """Key/value store of serialized conversation state with a TTL"""
+
+    def __init__(self, ttl_seconds: int = SESSION_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        blob = self._get(session_id)
+        return loads(blob) if blob is not None else None
+
+    def put(self, session_id: str, data: Dict[str, Any]) -> None:
+        self._put(session_id, dumps(data))
+
+    def peek(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Like get(), but leaves LRU order and expiry untouched (for diagnostics)"""
+        blob = self._peek(session_id)
+        return loads(blob) if blob is not None else None
+
+    def _peek(self, session_id: str) -> Optional[bytes]:
+        return self._get(session_id)
+
+    @abstractmethod
+    def _get(self, session_id: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def _put(self, session_id: str, blob: bytes) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def count(self) -> int:
+        ...
+
+    def evict_expired(self) -> int:
+        """Remove expired sessions; returns how many were removed"""
+        return 0
+
+    @abstractmethod
+    def largest(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """(session_id, stored bytes) for the biggest live sessions"""
+        ...
+
+
+class MemorySessionStore(SessionStore):
+    """In-process LRU with TTL"""
+
+    def __init__(self, ttl_seconds: int = SESSION_TTL_SECONDS, max_entries: int = SESSION_MAX_ENTRIES):
+        super().__init__(ttl_seconds)
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, session_id: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(session_id)
+            if entry is None:
+                return None
+            expires_at, blob = entry
+            if expires_at < time.time():
+                del self._data[session_id]
+                return None
+            self._data.move_to_end(session_id)
+            return blob
+
+    def _peek(self, session_id: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(session_id)
+        if entry is None or entry[0] < time.time():
+            return None
+        return entry[1]
+
+    def _put(self, session_id: str, blob: bytes) -> None:
+        with self._lock:
+            self._data[session_id] = (time.time() + self.ttl_seconds, blob)
+            self._data.move_to_end(session_id)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._data.pop(session_id, None) is not None
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def evict_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [k for k, (expires_at, _) in self._data.items() if expires_at < now]
+            for key in expired:
+                del self._data[key]
+        return len(expired)
+
+    def largest(self, limit: int = 10) -> List[Tuple[str, int]]:
+        now = time.time()
+        with self._lock:
+            sizes = [(k, len(blob)) for k, (expires_at, blob) in self._data.items() if expires_at >= now]
+        return heapq.nlargest(limit, sizes, key=lambda item: item[1])
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions table in a local SQLite file, shared by worker processes"""
+
+    SWEEP_EVERY = 256
+
+    def __init__(self, path: Path = SESSION_DB_PATH, ttl_seconds: int = SESSION_TTL_SECONDS):
+        super().__init__(ttl_seconds)
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, data BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_sessions_expires_at ON sessions (expires_at)")
+        self._conn.commit()
+
+    def _get(self, session_id: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM sessions WHERE session_id = ? AND expires_at >= ?",
+                (session_id, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def _put(self, session_id: str, blob: bytes) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, data, expires_at) VALUES (?, ?, ?)",
+                (session_id, blob, time.time() + self.ttl_seconds)
+            )
+            self._conn.commit()
+            self._writes += 1
+            sweep = self._writes % self.SWEEP_EVERY == 0
+        if sweep:
+            self.evict_expired()
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+        return cursor.rowcount > 0
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM sessions WHERE expires_at >= ?", (time.time(),)
+            ).fetchone()[0]
+
+    def evict_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM sessions WHERE expires_at < ?", (time.time(),))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def largest(self, limit: int = 10) -> List[Tuple[str, int]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session_id, length(data) FROM sessions WHERE expires_at >= ? "
+                "ORDER BY length(data) DESC LIMIT ?",
+                (time.time(), limit)
+            ).fetchall()
+        return [(session_id, size) for session_id, size in rows]
+
+
+class RedisSessionStore(SessionStore):
+    """Redis (or any Redis-compatible server); expiry is handled by SETEX"""
+
+    KEY_PREFIX = "salon:session:"
+
+    def __init__(self, url: str = REDIS_URL, ttl_seconds: int = SESSION_TTL_SECONDS):
+        super().__init__(ttl_seconds)
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("SESSION_STORE=redis requires the 'redis' package") from e
+        self._client = redis.Redis.from_url(url)
+
+    def _get(self, session_id: str) -> Optional[bytes]:
+        return self._client.get(self.KEY_PREFIX + session_id)
+
+    def _put(self, session_id: str, blob: bytes) -> None:
+        self._client.setex(self.KEY_PREFIX + session_id, self.ttl_seconds, blob)
+
+    def delete(self, session_id: str) -> bool:
+        return bool(self._client.delete(self.KEY_PREFIX + session_id))
+
+    def count(self) -> int:
+        """Walks the keyspace with SCAN: for /metrics, not for health probes"""
+        return sum(1 for _ in self._client.scan_iter(match=self.KEY_PREFIX + "*"))
+
+    def largest(self, limit: int = 10) -> List[Tuple[str, int]]:
+        keys = list(self._client.scan_iter(match=self.KEY_PREFIX + "*"))
+        pipe = self._client.pipeline()
+        for key in keys:
+            pipe.strlen(key)
+        sizes = [
+            (key.decode()[len(self.KEY_PREFIX):], size)
+            for key, size in zip(keys, pipe.execute())
+        ]
+        return heapq.nlargest(limit, sizes, key=lambda item: item[1])
+
+
+def create_session_store(backend: str = SESSION_STORE) -> SessionStore:
+    stores = {
+        "memory": MemorySessionStore,
+        "sqlite": SQLiteSessionStore,
+        "redis": RedisSessionStore,
+    }
+    if backend not in stores:
+        raise ValueError(f"Unknown SESSION_STORE '{backend}'. Use one of: {', '.join(stores)}")
+    return stores[backend]()
@@ -1,29 +1,36 @@
-from typing import Dict, Any
-from models import Customer, Booking, get_session
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+from models import Customer, Booking, async_session, get_session, parse_starts_at
 from utils.email_service import EmailService
 from utils.rag_pipeline import RAGPipeline
+from utils.customer_cache import customer_cache
+from utils.reminders import ReminderScheduler, ReminderTarget
+from utils.tracing import span
+from utils.validation import validate_record
+from sqlalchemy import func
 from sqlalchemy.exc import IntegrityError
-import re
+from sqlalchemy.orm import Session
 
 class BookingTools:
     """Tools for handling RAG, booking persistence, and email"""
     
-    def __init__(self, rag_pipeline: RAGPipeline):
+    def __init__(self, rag_pipeline: RAGPipeline, reminder_scheduler: Optional[ReminderScheduler] = None):
         self.rag_pipeline = rag_pipeline
         self.email_service = EmailService()
+        self.reminder_scheduler = reminder_scheduler
     
-    def rag_tool(self, query: str) -> Dict[str, Any]:
+    def rag_tool(self, query: str, namespace: Optional[str] = None) -> Dict[str, Any]:
         """
         RAG Tool: Retrieve information from uploaded documents
-        Input: query string
+        Input: query string, optional namespace (branch); None searches all
         Output: retrieved answer
         """
         try:
-            context = self.rag_pipeline.query(query)
+            result = self.rag_pipeline.rag_tool(query, namespace=namespace)
             
             return {
-                "success": True,
-                "answer": context,
+                "success": result["success"],
+                "answer": result["answer"] or "",
                 "message": "Successfully retrieved information"
             }
         except Exception as e:
@@ -36,98 +43,106 @@ class BookingTools:
     def booking_persistence_tool(self, booking_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Booking Persistence Tool: Save booking to database
-        Input: structured booking payload (name, email, phone, booking_type, date, time)
+        Input: structured booking payload (name, email, phone, booking_type, date, time,
+        optional branch and notes)
         Output: success status and booking ID
         """
+        validation = validate_record(booking_data)
+        if not validation.ok:
+            return _invalid_booking(validation)
+        
+        for attempt in range(2):
+            session = get_session()
+            try:
+                saved = save_booking(session, booking_data)
+                with span("db.commit"):
+                    session.commit()
+                break
+            except IntegrityError:
+                session.rollback()
+                if attempt:
+                    return _booking_failure("Database integrity error. This booking may already exist.")
+                # A concurrent booking created the same customer first: retry finds it
+            except Exception as e:
+                session.rollback()
+                return _booking_failure(f"Error saving booking: {str(e)}")
+            finally:
+                session.close()
+        
+        return self._booking_saved(booking_data, *saved)
+    
+    async def booking_persistence_tool_async(self, booking_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Booking Persistence Tool for asyncio callers: same input and output as
+        booking_persistence_tool, on the async engine (aiosqlite / asyncpg).
+        Benchmark-only for now: chat turns (Streamlit and the API) run in
+        threads and use booking_persistence_tool.
+        """
+        validation = validate_record(booking_data)
+        if not validation.ok:
+            return _invalid_booking(validation)
+        
+        for attempt in range(2):
+            async with async_session() as session:
+                try:
+                    saved = await session.run_sync(save_booking, booking_data)
+                    with span("db.commit"):
+                        await session.commit()
+                    break
+                except IntegrityError:
+                    await session.rollback()
+                    if attempt:
+                        return _booking_failure("Database integrity error. This booking may already exist.")
+                except Exception as e:
+                    await session.rollback()
+                    return _booking_failure(f"Error saving booking: {str(e)}")
+        
+        return self._booking_saved(booking_data, *saved)
+    
+    def _booking_saved(self, booking_data: Dict[str, Any], booking_id: int,
+                       starts_at: Optional[datetime], customer_name: str) -> Dict[str, Any]:
+        customer_cache.invalidate(booking_data['email'])
+        if self.reminder_scheduler and starts_at:
+            self.reminder_scheduler.on_booking_created(ReminderTarget(
+                booking_id=booking_id,
+                starts_at=starts_at,
+                to_email=booking_data['email'],
+                customer_name=customer_name,
+                booking_type=booking_data['booking_type']
+            ))
+        
+        return {
+            "success": True,
+            "booking_id": booking_id,
+            "message": "Booking saved successfully!"
+        }
+    
+    def cancel_booking_tool(self, booking_id: int) -> Dict[str, Any]:
+        """
+        Cancellation Tool: Mark a booking as cancelled
+        Input: booking ID
+        Output: success status
+        """
         session = get_session()
         
         try:
-            # Validate required fields
-            required_fields = ['name', 'email', 'phone', 'booking_type', 'date', 'time']
-            for field in required_fields:
-                if field not in booking_data or not booking_data[field]:
-                    return {
-                        "success": False,
-                        "booking_id": None,
-                        "message": f"Missing required field: {field}"
-                    }
-            
-            # Validate email format
-            email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-            if not re.match(email_pattern, booking_data['email']):
-                return {
-                    "success": False,
-                    "booking_id": None,
-                    "message": "Invalid email format. Please provide a valid email address."
-                }
-            
-            # Validate phone format (basic validation)
-            phone = booking_data['phone'].replace(' ', '').replace('-', '')
-            if not phone.isdigit() or len(phone) < 10:
-                return {
-                    "success": False,
-                    "booking_id": None,
-                    "message": "Invalid phone number. Please provide a valid 10-digit phone number."
-                }
-            
-            # Validate date format (YYYY-MM-DD)
-            date_pattern = r'^\d{4}-\d{2}-\d{2}$'
-            if not re.match(date_pattern, booking_data['date']):
-                return {
-                    "success": False,
-                    "booking_id": None,
-                    "message": "Invalid date format. Please enter date as YYYY-MM-DD."
-                }
-            
-            # Check if customer exists
-            customer = session.query(Customer).filter_by(email=booking_data['email']).first()
-            
-            if not customer:
-                # Create new customer
-                customer = Customer(
-                    name=booking_data['name'],
-                    email=booking_data['email'],
-                    phone=booking_data['phone']
-                )
-                session.add(customer)
-                session.flush()
-            
-            # Create booking
-            booking = Booking(
-                customer_id=customer.customer_id,
-                booking_type=booking_data['booking_type'],
-                date=booking_data['date'],
-                time=booking_data['time'],
-                status='confirmed'
-            )
-            session.add(booking)
-            session.commit()
+            booking = session.query(Booking).filter_by(id=booking_id).first()
+            if not booking:
+                return {"success": False, "message": f"Booking {booking_id} not found."}
             
-            booking_id = booking.id
-            session.close()
+            booking.status = 'cancelled'
+            with span("db.commit"):
+                session.commit()
             
-            return {
-                "success": True,
-                "booking_id": booking_id,
-                "message": "Booking saved successfully!"
-            }
+            if self.reminder_scheduler:
+                self.reminder_scheduler.on_booking_cancelled(booking_id)
             
-        except IntegrityError as e:
-            session.rollback()
-            session.close()
-            return {
-                "success": False,
-                "booking_id": None,
-                "message": "Database integrity error. This booking may already exist."
-            }
+            return {"success": True, "message": f"Booking {booking_id} cancelled."}
         except Exception as e:
             session.rollback()
+            return {"success": False, "message": f"Error cancelling booking: {str(e)}"}
+        finally:
             session.close()
-            return {
-                "success": False,
-                "booking_id": None,
-                "message": f"Error saving booking: {str(e)}"
-            }
     
     def email_tool(
         self,
@@ -159,28 +174,57 @@ class BookingTools:
                 "message": f"Email tool error: {str(e)}"
             }
 
-def validate_booking_data(data: Dict[str, Any]) -> tuple[bool, str]:
-    """Validate booking data format"""
-    
-    # Check required fields
-    required = ['name', 'email', 'phone', 'booking_type', 'date', 'time']
-    for field in required:
-        if field not in data or not data[field]:
-            return False, f"Missing required field: {field}"
-    
-    # Validate email
-    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    if not re.match(email_pattern, data['email']):
-        return False, "Invalid email format"
-    
-    # Validate date
-    date_pattern = r'^\d{4}-\d{2}-\d{2}$'
-    if not re.match(date_pattern, data['date']):
-        return False, "Invalid date format. Please use YYYY-MM-DD"
+def save_booking(session: Session, booking_data: Dict[str, Any]) -> Tuple[int, Optional[datetime], str]:
+    """
+    Add the booking (and its customer, if new) to session and flush.
+    Returns (booking_id, starts_at, customer_name); the caller commits.
+    """
+    # Check if customer exists
+    customer = session.query(Customer).filter(
+        func.lower(Customer.email) == booking_data['email'].lower()
+    ).first()
     
-    # Validate time
-    time_pattern = r'^\d{2}:\d{2}$'
-    if not re.match(time_pattern, data['time']):
-        return False, "Invalid time format. Please use HH:MM"
+    if not customer:
+        # Create new customer
+        customer = Customer(
+            name=booking_data['name'],
+            email=booking_data['email'],
+            phone=booking_data['phone']
+        )
+        session.add(customer)
+        session.flush()
     
-    return True, "Valid"
\ No newline at end of file
+    # Create booking
+    booking = Booking(
+        customer_id=customer.customer_id,
+        booking_type=booking_data['booking_type'],
+        date=booking_data['date'],
+        time=booking_data['time'],
+        starts_at=parse_starts_at(booking_data['date'], booking_data['time']),
+        branch=booking_data.get('branch'),
+        notes=booking_data.get('notes'),
+        status='confirmed'
+    )
+    session.add(booking)
+    session.flush()
+    return booking.id, booking.starts_at, customer.name
+
+def _invalid_booking(validation) -> Dict[str, Any]:
+    return {
+        "success": False,
+        "booking_id": None,
+        "error_code": validation.code.name,
+        "message": validation.message
+    }
+
+def _booking_failure(message: str) -> Dict[str, Any]:
+    return {
+        "success": False,
+        "booking_id": None,
+        "message": message
+    }
+
+def validate_booking_data(data: Dict[str, Any]) -> tuple[bool, str]:
+    """Validate booking data format"""
+    result = validate_record(data)
+    return result.ok, result.message
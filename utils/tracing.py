@@ -0,0 +1,189 @@
+"""
+Lightweight per-request tracing.
+
+Spans are written as JSON lines using OpenTelemetry field names
+(traceId, spanId, parentSpanId, name, startTimeUnixNano, endTimeUnixNano,
+attributes), so the file can be inspected directly or converted to OTLP.
+
+Disabled by default. When disabled, traced() adds a single flag check per
+call and span() returns a shared no-op context manager.
+
+Usage:
+    @traced("rag.embed_query")
+    def _embed_query(self, query): ...
+
+    with span("db.commit"):
+        session.commit()
+"""
+
+import atexit
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config import TRACE_FILE, TRACING_ENABLED
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_span_id", "start_ns", "end_ns",
+                 "attributes", "status", "_token")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes
+        self.status = "OK"
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def end(self):
+        self.end_ns = time.time_ns()
+        _exporter.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": (self.end_ns - self.start_ns) / 1e6,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.status = "ERROR"
+            self.attributes["exception.type"] = exc_type.__name__
+        _current_span.reset(self._token)
+        self.end()
+        return False
+
+
+class _NoopSpan:
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def end(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class JsonlExporter:
+    """Buffers finished spans and appends them to a JSONL file"""
+
+    def __init__(self, path: Path, flush_every: int = 64):
+        self.path = Path(path)
+        self.flush_every = flush_every
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        with self._lock:
+            self._buffer.append(span.to_dict())
+            # Flush at the end of each root span so a trace lands together
+            if span.parent_span_id is None or len(self._buffer) >= self.flush_every:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(s) + "\n" for s in self._buffer))
+        self._buffer = []
+
+
+_enabled = TRACING_ENABLED
+_exporter = JsonlExporter(TRACE_FILE)
+atexit.register(lambda: _exporter.flush())
+
+
+def enable(path: Optional[Path] = None):
+    global _enabled, _exporter
+    if path is not None:
+        _exporter.flush()
+        _exporter = JsonlExporter(path)
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    _exporter.flush()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def trace_file() -> Path:
+    return _exporter.path
+
+
+def span(name: str, **attributes):
+    """Context manager for a span; a shared no-op when tracing is disabled"""
+    if not _enabled:
+        return _NOOP_SPAN
+    return Span(name, _current_span.get(), attributes)
+
+
+def traced(name: str):
+    """Decorator that wraps every call to fn in a span"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with Span(name, _current_span.get(), {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def load_spans(path: Optional[Path] = None, limit: int = 50_000) -> List[Dict[str, Any]]:
+    """Read the most recent spans from a JSONL trace file"""
+    path = Path(path or trace_file())
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        lines = deque(f, maxlen=limit)  # streams the file; keeps only the tail in memory
+    spans = []
+    for line in lines:
+        try:
+            spans.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return spans
@@ -0,0 +1,163 @@
+"""
+Booking validation engine shared by the chat flow, the persistence tool
+and bulk imports.
+
+Two entry points over the same precompiled rules:
+- validate_record(): one booking dict at a time (chat turns)
+- validate_batch(): columnar arrays / DataFrames (imports), vectorized
+"""
+
+import re
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, Dict, Mapping, Optional
+
+
+REQUIRED_FIELDS = ['name', 'email', 'phone', 'booking_type', 'date', 'time']
+
+# -----------------------------
+# Precompiled patterns (always applied with fullmatch: `$` would accept a trailing newline)
+# -----------------------------
+EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+# 10-15 digits, spaces and dashes allowed anywhere as separators
+PHONE_RE = re.compile(r'[ -]*(?:\d[ -]*){10,15}')
+DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}')
+TIME_RE = re.compile(r'(?:[01]\d|2[0-3]):[0-5]\d')
+
+
+class ValidationCode(IntEnum):
+    """Structured validation outcome. Stored as int8 in batch results."""
+    OK = 0
+    MISSING_FIELD = 1
+    INVALID_EMAIL = 2
+    INVALID_PHONE = 3
+    INVALID_DATE = 4
+    INVALID_TIME = 5
+
+
+ERROR_MESSAGES = {
+    ValidationCode.OK: "Valid",
+    ValidationCode.MISSING_FIELD: "Missing required field: {field}",
+    ValidationCode.INVALID_EMAIL: "Invalid email format. Please provide a valid email address.",
+    ValidationCode.INVALID_PHONE: "Invalid phone number. Please provide a valid 10-digit phone number.",
+    ValidationCode.INVALID_DATE: "Invalid date format. Please enter date as YYYY-MM-DD.",
+    ValidationCode.INVALID_TIME: "Invalid time format. Please enter time as HH:MM.",
+}
+
+# Order in which format checks run; the first failure is reported
+FORMAT_CHECKS = [
+    ('email', EMAIL_RE, ValidationCode.INVALID_EMAIL),
+    ('phone', PHONE_RE, ValidationCode.INVALID_PHONE),
+    ('date', DATE_RE, ValidationCode.INVALID_DATE),
+    ('time', TIME_RE, ValidationCode.INVALID_TIME),
+]
+
+
+@dataclass(frozen=True)
+class ValidationResult:
+    code: ValidationCode
+    field: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.code == ValidationCode.OK
+
+    @property
+    def message(self) -> str:
+        return ERROR_MESSAGES[self.code].format(field=self.field)
+
+
+VALID = ValidationResult(ValidationCode.OK)
+
+
+# -----------------------------
+# Missing values: None, NaN / NA, or the empty string (same rule in both APIs)
+# -----------------------------
+def is_missing(value: Any) -> bool:
+    if value is None:
+        return True
+    try:
+        if value != value:  # NaN
+            return True
+    except TypeError:
+        return True  # pandas.NA: comparisons are NA, which refuses bool()
+    return str(value) == ""
+
+
+def missing_mask(values):
+    """is_missing() over a pandas string Series, as a bool NumPy array"""
+    return (values.isna() | (values == "")).to_numpy(dtype=bool)
+
+
+# -----------------------------
+# Row-at-a-time API
+# -----------------------------
+def validate_field(field: str, value: Any) -> ValidationResult:
+    """Validate a single slot value as soon as it is collected"""
+    if is_missing(value):
+        return ValidationResult(ValidationCode.MISSING_FIELD, field)
+
+    for check_field, pattern, code in FORMAT_CHECKS:
+        if check_field != field:
+            continue
+        if not pattern.fullmatch(str(value)):
+            return ValidationResult(code, field)
+
+    return VALID
+
+
+def validate_record(data: Mapping[str, Any]) -> ValidationResult:
+    """Validate a single booking payload, returning the first failure"""
+    for field in REQUIRED_FIELDS:
+        if is_missing(data.get(field)):
+            return ValidationResult(ValidationCode.MISSING_FIELD, field)
+
+    for field, _, _ in FORMAT_CHECKS:
+        result = validate_field(field, data[field])
+        if not result.ok:
+            return result
+
+    return VALID
+
+
+# -----------------------------
+# Columnar batch API
+# -----------------------------
+def validate_batch(columns: Mapping[str, Any]):
+    """
+    Validate many bookings at once.
+
+    Input: a DataFrame or a mapping of field name -> array-like column
+    Output: int8 NumPy array of ValidationCode values, one per row, with
+    the same precedence as validate_record()
+    """
+    import numpy as np
+    import pandas as pd
+
+    missing = [f for f in REQUIRED_FIELDS if f not in columns]
+    if missing:
+        raise KeyError(f"Missing required column: {missing[0]}")
+
+    series: Dict[str, pd.Series] = {}
+    for field in REQUIRED_FIELDS:
+        values = pd.Series(columns[field], copy=False)
+        if not pd.api.types.is_string_dtype(values) or values.dtype == object:
+            values = values.astype("string")
+        series[field] = values
+
+    n_rows = len(series[REQUIRED_FIELDS[0]])
+    codes = np.zeros(n_rows, dtype=np.int8)
+    if n_rows == 0:
+        return codes
+
+    # Apply checks in reverse precedence so earlier checks overwrite later ones
+    for field, pattern, code in reversed(FORMAT_CHECKS):
+        bad = ~series[field].str.fullmatch(pattern).fillna(False).to_numpy(dtype=bool)
+        codes[bad] = code
+
+    missing_any = np.zeros(n_rows, dtype=bool)
+    for field in REQUIRED_FIELDS:
+        missing_any |= missing_mask(series[field])
+    codes[missing_any] = ValidationCode.MISSING_FIELD
+
+    return codes